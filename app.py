@@ -2,151 +2,65 @@ import streamlit as st
 import pandas as pd
 import plotly.express as px
 
+from charts import MAX_POINTS, RESOLUTIONS, cumulative_by_year, downsample
+from ingest import cached_sheet_long, content_hash
+from profiling import env_enabled, finish, stage, start_run
+from render import SSS, SUBTOTAL, TOTAL, paged, row_kinds, row_styles
+from report_calc import SHEET_OPTIONS, build_cube, build_report, calc_bases, prepare_long
+from slice_index import build_slice_index, slice_options, slice_rows_many
+
 st.set_page_config(page_title="OTD 누적 전년비 대시보드", layout="wide")
 
 # ───────────────────── 1. 전처리 ─────────────────────
-@st.cache_data
-def preprocess(xlsx):
-    df = pd.read_excel(xlsx, sheet_name="DATA")
-    df.columns = df.columns.map(str).str.strip()
-
-    # 한글 → 영문 컬럼 매핑
-    mapper = {}
-    for c in df.columns:
-        k = c.replace(" ", "")
-        if k == "구분":   mapper[c] = "division"
-        elif k == "사이트": mapper[c] = "site"
-        elif k == "일자":  mapper[c] = "date"
-        elif k == "매출":  mapper[c] = "sales"
-    df = df.rename(columns=mapper)
-
-    # wide → long (brand 제거)
-    df = df.melt(id_vars=["division", "site"],
-                 var_name="date", value_name="sales")
-
-    # 형 변환
-    df["sales"] = pd.to_numeric(df["sales"], errors="coerce").fillna(0).astype(int)
-    df["date"]  = pd.to_datetime(df["date"], errors="coerce")
-    df.dropna(subset=["date"], inplace=True)
-
-    # 파생
-    df["ym"]    = df["date"].dt.to_period("M").astype(str)
-    df["year"]  = df["date"].dt.year
-    df["month"] = df["date"].dt.month
-    df["day"]   = df["date"].dt.day
-    df["division"] = df["division"].astype(str).fillna("기타")
-    return df
+def preprocess(data):
+    # wide → long (brand 제거): 스트리밍 파싱 + 내용 해시 디스크 캐시
+    return prepare_long(cached_sheet_long(data, **SHEET_OPTIONS))
+
+@st.cache_resource
+def load_cube(digest, _data):
+    # 원본 long 프레임은 버리고 division × site × 일자 큐브만 division 인덱스와 함께 캐시 (키: 내용 해시)
+    return build_slice_index(build_cube(preprocess(_data)), ["division"])
 
 # ───────────────────── 2. 파일 업로드 ─────────────────────
 upl = st.sidebar.file_uploader("📂 매출 엑셀 업로드", type=["xlsx"])
 if upl is None:
     st.stop()
-df_raw = preprocess(upl)
+upl_data = upl.getvalue()
+digest = content_hash(upl_data)
+prof = start_run("app", env_enabled())
+with stage(prof, "preprocess") as s:
+    cube_index = load_cube(digest, upl_data)
+    s["out"] = cube = cube_index["data"]
 
 # ───────────────────── 3. 필터 UI ─────────────────────
 st.title("📊 매장별 누적·SSS 전년비 대시보드")
 with st.expander("🔎 필터", expanded=True):
     c1, c2 = st.columns([1.6, 3])
-    months = sorted(df_raw["ym"].unique(), reverse=True)
-    divs   = sorted(df_raw["division"].unique())
+    months = sorted(pd.Series(cube["date"].unique()).dt.strftime("%Y-%m").unique(), reverse=True)
+    divs   = slice_options(cube_index)
 
     sel_months = c1.multiselect("기준 월 (복수 선택 가능)", months, default=[months[0]])
     sel_divs   = c2.multiselect("구분 (division)",         divs,   default=divs)
 if not sel_months:
     st.info("월을 선택하세요."); st.stop()
 
-ref_month = sel_months[0]           # 첫 번째 월을 기준으로 계산
-CY, CM = int(ref_month[:4]), int(ref_month[-2:])
-PY = CY - 1
-df = df_raw[df_raw["division"].isin(sel_divs)]
+df = slice_rows_many(cube_index, sel_divs)
 
 # ───────────────────── 4. 누적·전년비·SSS 판정 ─────────────────────
-def ratio(cur, prev):
-    return "-" if prev == 0 or cur == 0 else f"{((cur/prev)-1)*100:+.1f}%"
-
-def calc(g):
-    cur_rows = g[(g["year"] == CY) & (g["month"] == CM)]
-    if cur_rows.empty:
-        return pd.Series(dtype="float64")
-    cutoff = cur_rows["day"].max()
-
-    m_cur  = cur_rows["sales"].sum()
-    m_prev = g[(g["year"] == PY) & (g["month"] == CM) & (g["day"] <= cutoff)]["sales"].sum()
-
-    y_cur = g[(g["year"] == CY) &
-              ((g["month"] < CM) | ((g["month"] == CM) & (g["day"] <= cutoff)))]["sales"].sum()
-    y_prev = g[(g["year"] == PY) &
-               ((g["month"] < CM) | ((g["month"] == CM) & (g["day"] <= cutoff)))]["sales"].sum()
-
-    same_store = (m_cur > 0) & (m_prev > 0)  # SSS 여부
-    return pd.Series({
-        "division": g.iloc[0]["division"],
-        "site":     g.iloc[0]["site"],
-        "month_cur": m_cur,
-        "month_prev": m_prev,
-        "ytd_cur":   y_cur,
-        "ytd_prev":  y_prev,
-        "SSS": same_store
-    })
-
-base = df.groupby(["division", "site"]).apply(calc).reset_index(drop=True)
-
-# ───────────────────── 5. 집계 + SSS 집계 ─────────────────────
-def make_total(df_part, label):
-    s = df_part.select_dtypes("number").sum()
-    return pd.Series({
-        "division": label, "site": "",
-        f"{CY} 당월": s.month_cur,
-        f"{CY} YTD":  s.ytd_cur,
-        "당월 전년비(%)": ratio(s.month_cur, s.month_prev),
-        "YTD 전년비(%)":  ratio(s.ytd_cur,  s.ytd_prev)
-    })
-
-# 기본 합계 & SSS 합계
-tot_row     = make_total(base, "합계")
-sss_tot_row = make_total(base[base["SSS"]], "SSS 합계")
-
-# division 소계 & SSS 소계
-div_totals = []
-div_sss_totals = []
-for div, grp in base.groupby("division"):
-    div_totals.append(make_total(grp, f"{div} 소계"))
-    div_sss_totals.append(make_total(grp[grp["SSS"]], f"{div} SSS 소계"))
-
-# 상세 행
-detail = base.assign(**{
-    f"{CY} 당월":  base["month_cur"],
-    f"{CY} YTD":   base["ytd_cur"],
-    "당월 전년비(%)": base.apply(lambda r: ratio(r.month_cur, r.month_prev), axis=1),
-    "YTD 전년비(%)":  base.apply(lambda r: ratio(r.ytd_cur,  r.ytd_prev),  axis=1)
-})[["division","site",f"{CY} 당월","당월 전년비(%)",f"{CY} YTD","YTD 전년비(%)"]]
-
-# 병합 (합계 → SSS 합계 → 소계 → SSS 소계 → 상세)
-table_parts = [
-    tot_row.to_frame().T,
-    sss_tot_row.to_frame().T,
-    pd.DataFrame(div_totals),
-    pd.DataFrame(div_sss_totals),
-    detail
-]
-full = pd.concat(table_parts, ignore_index=True)
-
-# 숫자 서식 적용
-for col in [f"{CY} 당월", f"{CY} YTD"]:
-    full[col] = full[col].apply(lambda x: f"{int(x):,}" if isinstance(x,(int,float)) else x)
-
-# ───────────────────── 6. 스타일 & sticky ─────────────────────
-def style_df(df):
-    def row_color(row):
-        if "SSS" in row["division"]:
-            return ["background-color: lightcyan"] * len(row)
-        if "합계" in row["division"] or "소계" in row["division"]:
-            return ["background-color: mistyrose"] * len(row)
-        return ["" for _ in row]
+# 선택한 기준 월 전부를 한 번에 계산
+with stage(prof, "calc", df) as s:
+    s["out"] = bases = calc_bases(df, sel_months)
 
+# ───────────────────── 5. 스타일 & sticky ─────────────────────
+# 행 종류(division 라벨)별 색: SSS 행 → lightcyan, 합계·소계 → mistyrose
+ROW_PALETTE = {SSS: "background-color: lightcyan",
+               TOTAL: "background-color: mistyrose", SUBTOTAL: "background-color: mistyrose"}
+
+def style_df(df):
+    styles = row_styles(df, row_kinds(df["division"]), ROW_PALETTE)
     sty = (df.style
            .hide(axis="index")
-           .apply(row_color, axis=1)
+           .apply(lambda _: styles, axis=None)
            .set_table_styles([
                {"selector":"th","props":[("background","#f3f3f3"),("text-align","center")]},
                {"selector":"td","props":[("text-align","right")]},
@@ -157,22 +71,40 @@ def style_df(df):
            ]))
     return sty
 
-st.subheader(f"📋 {ref_month} 기준 누적 매출 & SSS")
-tbl_html = style_df(full).to_html()
-st.markdown(f'<div style="max-height:600px;overflow-y:auto">{tbl_html}</div>', unsafe_allow_html=True)
-
-# ───────────────────── 7. KPI ─────────────────────
-tot_num = base[["month_cur","ytd_cur"]].sum()
-k1,k2 = st.columns(2)
-k1.metric("전체 당월 누적", f"{tot_num.month_cur:,.0f}")
-k2.metric("전체 YTD 누적",  f"{tot_num.ytd_cur:,.0f}")
+# ───────────────────── 6. 기준 월별 표 + KPI ─────────────────────
+for ref_month, tab in zip(sel_months, st.tabs(sel_months)):
+    base = bases[ref_month]
+    CY = int(ref_month[:4])
+    with tab:
+        st.subheader(f"📋 {ref_month} 기준 누적 매출 & SSS")
+        with stage(prof, f"build_report {ref_month}", base) as s:
+            s["out"] = report = build_report(base, CY)
+        # 합계·SSS 합계는 매 페이지 맨 위에 고정, 나머지(소계·상세)는 현재 페이지만 HTML 로 만든다
+        page = paged(report, f"page_{ref_month}", pinned=report["division"].isin(["합계", "SSS 합계"]))
+        with stage(prof, f"style_df {ref_month}", page):
+            tbl_html = style_df(page).to_html()
+        st.markdown(f'<div style="max-height:600px;overflow-y:auto">{tbl_html}</div>', unsafe_allow_html=True)
+
+        tot_num = base[["month_cur","ytd_cur"]].sum()
+        k1,k2 = st.columns(2)
+        k1.metric("전체 당월 누적", f"{tot_num.month_cur:,.0f}")
+        k2.metric("전체 YTD 누적",  f"{tot_num.ytd_cur:,.0f}")
+
+# ───────────────────── 7. 누적 추이 그래프 ─────────────────────
+@st.cache_data(max_entries=16)
+def cumulative_chart(digest, divs, freq, _df):
+    # 같은 파일·구분·단위면 다시 계산하지 않는다. 연도별 누계를 같은 월-일 x 축에 겹쳐 그린다
+    return downsample(cumulative_by_year(_df, "date", "sales", freq), "x", "sales", "year", MAX_POINTS)
 
-# ───────────────────── 8. 누적 추이 그래프 ─────────────────────
 st.subheader("연간 누적 매출 추이")
-cumsum = (df.groupby(["year","date"])["sales"].sum()
-            .groupby(level=0).cumsum().reset_index())
-cumsum["ym"] = cumsum["date"].dt.to_period("M").astype(str)
-fig = px.line(cumsum, x="ym", y="sales", color="year", markers=True,
-              labels={"ym":"월","sales":"누적","year":"연도"})
-fig.update_layout(yaxis_tickformat=",.0f")
-st.plotly_chart(fig, use_container_width=True)
+resolution = st.radio("단위", list(RESOLUTIONS), horizontal=True, key="chart_resolution")
+with stage(prof, "chart", df) as s:
+    s["out"] = cumsum = cumulative_chart(digest, tuple(sel_divs), RESOLUTIONS[resolution], df)
+    cumsum["year"] = cumsum["year"].astype(str)
+    fig = px.line(cumsum, x="x", y="sales", color="year", markers=resolution != "일별",
+                  hover_data={"x": False, "date": "|%Y-%m-%d"},
+                  labels={"x":"월","sales":"누적","year":"연도","date":"일자"})
+    fig.update_layout(yaxis_tickformat=",.0f", xaxis_tickformat="%m월", xaxis_dtick="M1")
+    st.plotly_chart(fig, use_container_width=True)
+
+finish(prof)
@@ -1,261 +1,176 @@
 import streamlit as st
 import pandas as pd
-import os
-from datetime import datetime
 
-st.set_page_config(page_title="OTD SALES", layout="wide")
-
-# 파일 경로
-DAILY_FILE = os.path.expanduser("~/.streamlit/saved_daily.csv")
-MONTHLY_FILE = os.path.expanduser("~/.streamlit/saved_monthly.csv")
-
-# 유틸 함수들
-def is_month_based(columns):
-    import re
-    date_cols = [col for col in columns if re.match(r'^\d{4}-\d{2}$', str(col))]
-    if not date_cols:
-        return False
-    try:
-        sample = pd.to_datetime(date_cols, format='%Y-%m', errors='coerce')
-        return sample.notna().all()
-    except:
-        return False
-
-def load_data(file_path):
-    if os.path.exists(file_path):
-        return pd.read_csv(file_path)
-    return None
-
-def save_data(df, file_path):
-    df.to_csv(file_path, index=False)
-
-def merge_data(old_df, new_df):
-    id_cols = ['사업부', '유형', '사이트', '브랜드']
-    merged = old_df.copy() if old_df is not None else pd.DataFrame(columns=new_df.columns)
-    for _, row in new_df.iterrows():
-        mask = (
-            (merged['사업부'] == row['사업부']) &
-            (merged['유형'] == row['유형']) &
-            (merged['사이트'] == row['사이트']) &
-            (merged['브랜드'] == row['브랜드'])
-        ) if not merged.empty else pd.Series([False] * len(merged))
-        if mask.any():
-            for col in new_df.columns[4:]:
-                if col in merged.columns:
-                    merged.loc[mask, col] = row[col]
-                else:
-                    merged[col] = row[col]
-        else:
-            merged = pd.concat([merged, pd.DataFrame([row])], ignore_index=True)
-    return merged
-
-def format_number(n):
-    try:
-        return f"{int(float(n)):,}".rjust(15)
-    except:
-        return str(n)
+from sales_store import (DAILY, MONTHLY, ID_COLS, cube_version, is_month_based, list_months, load_cube,
+                         load_site_daily, load_site_ref, migrate_legacy_csv, upsert_partitions)
+from ingest import cached_sheet_long, compact_frame, content_hash, read_header
+from sales_tables import add_total, add_yoy, build_site_tables, pivot_pair, shift_period, yoy_table
+from render import paged, style_table
+from charts import RESOLUTIONS, downsample_wide, period_series
+from slice_index import build_slice_index, slice_options, slice_rows
+from profiling import finish, stage, start_run
 
-def safe_str_to_int(x):
-    try:
-        x = str(x).replace(',', '').strip()
-        if '%' in x or x == '' or x == '-':
-            return 0
-        return int(float(x))
-    except:
-        return 0
-
-def style_summary(df):
-    return df.style.apply(lambda x: ['background-color: #ffe6ea' if x.name != '합계' and '[' in str(x.name) else 'background-color: #e6f0ff' if x.name == '합계' else ''] * len(x), axis=1)
-
-def add_yoy_column(df, group_cols):
-    df_2024 = df[df['기준'].str.startswith('2024')].copy()
-    df_2025 = df[df['기준'].str.startswith('2025')].copy()
-    df_2024['key'] = pd.to_datetime(df_2024['기준']) + pd.DateOffset(years=1)
-    df_2024['key'] = df_2024['key'].dt.strftime('%Y-%m')
-    df_2025['key'] = df_2025['기준']
-    merged = pd.merge(df_2025, df_2024[['key', '매출']], on='key', how='left', suffixes=('', '_전년'))
-    merged['전년비'] = ((merged['매출'] - merged['매출_전년']) / merged['매출_전년'] * 100).round(1)
-    merged['전년비'] = merged['전년비'].apply(lambda x: f"{x:+.1f}%" if pd.notnull(x) else "-")
-    merged.drop(columns=['key'], inplace=True)
-    return merged
+st.set_page_config(page_title="OTD SALES", layout="wide")
 
 # UI
 st.title("📊 OTD SALES")
 user_type = st.sidebar.radio("접속 유형을 선택하세요:", ("일반 사용자", "관리자"))
 view_mode = "월별"
 
+is_admin = False
 if user_type == "관리자":
     password = st.sidebar.text_input("비밀번호를 입력하세요", type="password")
-    if password == "1818":
-        uploaded_file = st.sidebar.file_uploader("매출 데이터 엑셀 업로드", type=[".xlsx"])
-        if uploaded_file:
-            new_df = pd.read_excel(uploaded_file)
-            if is_month_based(new_df.columns):
-                daily_ref = load_data(DAILY_FILE)
-                if daily_ref is not None:
-                    ref_cols = ['사이트', '사업부', '유형', '브랜드']
-                    ref_table = daily_ref[ref_cols].drop_duplicates()
-                    new_df = pd.merge(new_df, ref_table, on='사이트', how='left')
-                    for col in ['사업부', '유형', '브랜드']:
-                        if col not in new_df.columns:
+    is_admin = password == "1818"
+
+# 단계별 프로파일링은 관리자만 켤 수 있다
+prof = start_run('app2', is_admin and st.sidebar.checkbox("⏱ 단계별 프로파일링"))
+
+uploaded_file = None
+if is_admin:
+    uploaded_file = st.sidebar.file_uploader("매출 데이터 엑셀 업로드", type=[".xlsx"])
+    if uploaded_file:
+        # 같은 파일(내용 해시)은 다시 파싱·저장하지 않는다
+        data = uploaded_file.getvalue()
+        digest = content_hash(data)
+        if st.session_state.get('ingested') != digest:
+            with stage(prof, 'upload parse') as s:
+                s['out'] = new_df = cached_sheet_long(data)
+            with stage(prof, 'upload store', new_df):
+                if is_month_based(read_header(data)):
+                    ref_table = load_site_ref()
+                    if not ref_table.empty:
+                        new_df = pd.merge(new_df, ref_table, on='사이트', how='left')
+                        for col in ['사업부', '유형', '브랜드']:
+                            if col not in new_df.columns:
+                                new_df[col] = '미정'
+                            new_df[col] = new_df[col].fillna('미정')
+                    else:
+                        for col in ['사업부', '유형', '브랜드']:
                             new_df[col] = '미정'
-                        new_df[col] = new_df[col].fillna('미정')
+                    upsert_partitions(new_df[ID_COLS + ['일자', '매출']], MONTHLY)
                 else:
-                    for col in ['사업부', '유형', '브랜드']:
-                        new_df[col] = '미정'
-                old_df = load_data(MONTHLY_FILE)
-                merged_df = merge_data(old_df, new_df)
-                save_data(merged_df, MONTHLY_FILE)
-            else:
-                old_df = load_data(DAILY_FILE)
-                merged_df = merge_data(old_df, new_df)
-                save_data(merged_df, DAILY_FILE)
-            st.success("데이터가 성공적으로 저장되었습니다.")
-else:
-    uploaded_file = None
-
-daily_data = load_data(DAILY_FILE)
-monthly_data = load_data(MONTHLY_FILE)
-if daily_data is None and monthly_data is None:
+                    upsert_partitions(new_df[ID_COLS + ['일자', '매출']], DAILY)
+            st.session_state['ingested'] = digest
+        st.success("데이터가 성공적으로 저장되었습니다.")
+
+# 데이터 로딩: 월별 저장소가 있으면 월별, 없으면 일별 저장소의 월 큐브(업로드 시 갱신)를 읽는다
+migrate_legacy_csv()
+has_daily = bool(list_months(DAILY))
+has_monthly = bool(list_months(MONTHLY))
+if not has_daily and not has_monthly:
     st.info("데이터가 없습니다. 관리자만 업로드할 수 있습니다.")
     st.stop()
 
-data = monthly_data.copy() if monthly_data is not None else pd.DataFrame()
-required_columns = ['사업부', '유형', '사이트', '브랜드']
-value_columns = [col for col in data.columns if col not in required_columns]
-if data.empty and daily_data is not None:
-    data = daily_data.copy()
-    data_melted = data.melt(id_vars=required_columns, value_vars=value_columns, var_name="일자", value_name="매출")
-    data_melted['일자'] = pd.to_datetime(data_melted['일자'], errors='coerce')
-    data_melted.dropna(subset=['일자'], inplace=True)
-    data_melted['매출'] = pd.to_numeric(data_melted['매출'], errors='coerce').fillna(0)
-    data_melted['기준'] = data_melted['일자'].dt.to_period("M").astype(str)
-    data_melted = data_melted[data_melted['기준'] >= '2025-01']
-else:
-    data_melted = data.melt(id_vars=required_columns, value_vars=value_columns, var_name="일자", value_name="매출")
-    data_melted['일자'] = pd.to_datetime(data_melted['일자'], errors='coerce')
-    data_melted.dropna(subset=['일자'], inplace=True)
-    data_melted['매출'] = pd.to_numeric(data_melted['매출'], errors='coerce').fillna(0)
-    data_melted['기준'] = data_melted['일자'].dt.to_period("M").astype(str)
-    data_melted = data_melted[data_melted['기준'] >= '2025-01']
+# 화면은 VIEW_FROM 부터, 전년비 계산을 위해 1년 앞 데이터까지 읽는다
+VIEW_FROM = '2025-01'
+data_kind = MONTHLY if has_monthly else DAILY
+
+@st.cache_resource(max_entries=4)
+def shared_cube(kind, start, version):
+    # 모든 세션이 함께 쓰는 읽기 전용 큐브: 업로드로 큐브 파일이 바뀔 때(version)만 다시 읽는다
+    return compact_frame(load_cube(kind, start=start), ID_COLS, '매출')
+
+with stage(prof, 'load cube') as s:
+    version = cube_version(data_kind)
+    s['out'] = cube = shared_cube(data_kind, shift_period(VIEW_FROM, -12), version)
+view = cube[cube['기준'] >= VIEW_FROM]
+
+@st.cache_resource(max_entries=4)
+def site_index(_cube, kind, version):
+    # 사업부 → 유형 → 사이트 계층 인덱스 (큐브가 바뀔 때만 다시 만든다)
+    # 행은 전년비용 이전 기간까지 포함하고, 선택지는 화면 기간(VIEW_FROM~)에 행이 있는 것만
+    return build_slice_index(_cube, ['사업부', '유형', '사이트'], option_rows=_cube['기준'] >= VIEW_FROM)
+
+def with_yoy(df, group_cols):
+    # 전체 그룹의 전년비를 한 번에 계산한 뒤 화면 기간만 남긴다 (숫자 그대로)
+    out = add_yoy(df, group_cols)
+    return out[out['기준'] >= VIEW_FROM]
 
 # 1️⃣ 사업부별 매출
 st.subheader("1️⃣ 사업부별 매출")
-sum_dept = data_melted.groupby(['기준', '사업부'])['매출'].sum().reset_index()
-sum_dept = add_yoy_column(sum_dept, ['사업부'])
-sum_dept = sum_dept.pivot(index='사업부', columns='기준', values=['매출', '전년비'])
-sum_dept.columns = [f"{col[1]} {'전년비' if col[0] == '전년비' else ''}".strip() for col in sum_dept.columns]
-sum_dept = sum_dept.fillna(0)
-sum_dept.reset_index(inplace=True)
-sum_dept.set_index('사업부', inplace=True)
-sum_dept = sum_dept.astype(str)
-sum_dept = sum_dept.applymap(lambda x: x if '%' in x else format_number(x))
-total = pd.DataFrame(sum_dept.apply(lambda s: s.map(safe_str_to_int)).sum()).T
-total.index = ['합계']
-total = total.applymap(lambda x: format_number(x))
-sum_dept = pd.concat([total, sum_dept])
-st.dataframe(style_summary(sum_dept).set_properties(**{'text-align': 'right'}), use_container_width=True)
+with stage(prof, 'section 1', cube) as s:
+    sum_dept = cube.groupby(['기준', '사업부'], observed=True)['매출'].sum().reset_index()
+    sum_dept = with_yoy(sum_dept, ['사업부'])
+    cur, prev = add_total(*pivot_pair(sum_dept, '사업부'), '합계')
+    s['out'] = table = yoy_table(cur, prev)
+    st.dataframe(style_table(table), use_container_width=True)
 
 # 2️⃣ 사이트별 매출
 st.subheader("2️⃣ 사이트별 매출")
 
-for dept in sorted(data_melted['사업부'].unique()):
-    st.markdown(f"### 📍 {dept} 사업부")
-    sub_data = data_melted[data_melted['사업부'] == dept].copy()
-    df_list = []
-    for t in sorted(sub_data['유형'].unique()):
-        df_u = sub_data[sub_data['유형'] == t].copy()
-        sum_site = df_u.groupby(['기준', '사이트'])['매출'].sum().reset_index()
-        sum_site = add_yoy_column(sum_site, ['사이트'])
-        sum_site = sum_site.pivot(index='사이트', columns='기준', values=['매출', '전년비'])
-        sum_site = sum_site.sort_index(axis=1, key=lambda x: x.str.replace(' 전년비', ''))
-        new_columns = []
-        for col in sorted(set(c.replace(' 전년비', '') for c in sum_site.columns.get_level_values(1))):
-            new_columns.append(('매출', col))
-            new_columns.append(('전년비', col))
-        sum_site = sum_site.reindex(columns=pd.MultiIndex.from_tuples(new_columns))
-        sum_site.columns = ["전년비" if col[0] == '전년비' else col[1] for col in sum_site.columns]
-        sum_site = sum_site.fillna(0)
-        sum_site.reset_index(inplace=True)
-        sum_site.set_index('사이트', inplace=True)
-        sum_site = sum_site.astype(str)
-        sum_site = sum_site.applymap(lambda x: x if '%' in x else format_number(x))
-        subtotal = pd.DataFrame(sum_site.applymap(parse_sales_value).sum()).T
-        subtotal.index = [f"[{t} 소계]"]
-        subtotal = subtotal.applymap(lambda x: format_number(x))
-        df_list.append(pd.concat([subtotal, sum_site]))
-
-    combined = pd.concat(df_list)
-    total_only = combined[~combined.index.str.startswith('[')]
-    total_sum = pd.DataFrame(total_only.applymap(parse_sales_value).sum()).T
-    total_sum.index = ['합계']
-    final_df = pd.concat([total_sum, combined])
-
-    styled = final_df.applymap(format_number).reset_index().rename(columns={'index': '사이트'})
-    styled = styled.style.apply(lambda x: [
-        'background-color: #e6f0ff' if x['사이트'] == '합계' else
-        'background-color: #ffe6ea' if '[' in x['사이트'] else ''
-    ] * len(x), axis=1)
-
-    st.dataframe(styled.set_properties(**{'text-align': 'right'}), use_container_width=True)
+with stage(prof, 'section 2', cube) as s:
+    s['out'] = site_tables = build_site_tables(cube, VIEW_FROM)
+    for dept, table in site_tables.items():
+        st.markdown(f"### 📍 {dept} 사업부")
+        page = paged(table, f"page_site_{dept}", pinned=table.index == '합계')
+        st.dataframe(style_table(page), use_container_width=True)
 
 # 3️⃣ 브랜드별 매출
 st.subheader("3️⃣ 브랜드별 매출")
 view_mode = st.selectbox("분석 기준 선택", ["월별", "일별"])
 col1, col2, col3 = st.columns(3)
+brand_index = site_index(cube, data_kind, version)
 with col1:
-    selected_dept = st.selectbox("사업부 선택", sorted(data_melted['사업부'].unique()))
+    selected_dept = st.selectbox("사업부 선택", slice_options(brand_index))
 with col2:
-    selected_type = st.selectbox("유형 선택", sorted(data_melted[data_melted['사업부'] == selected_dept]['유형'].unique()))
+    selected_type = st.selectbox("유형 선택", slice_options(brand_index, selected_dept))
 with col3:
-    selected_site = st.selectbox("사이트 선택", sorted(data_melted[(data_melted['사업부'] == selected_dept) & (data_melted['유형'] == selected_type)]['사이트'].unique()))
-
-filtered = data_melted[
-    (data_melted['사업부'] == selected_dept) &
-    (data_melted['유형'] == selected_type) &
-    (data_melted['사이트'] == selected_site)
-]
+    selected_site = st.selectbox("사이트 선택", slice_options(brand_index, selected_dept, selected_type))
 
-sum_brand = filtered.groupby(['기준', '브랜드'])['매출'].sum().reset_index()
-sum_brand = add_yoy_column(sum_brand, ['브랜드']) if view_mode == "월별" else sum_brand
-if view_mode == "월별":
-    sum_brand = sum_brand.pivot(index='브랜드', columns='기준', values=['매출', '전년비'])
-    sum_brand.columns = [f"{col[1]} {'전년비' if col[0] == '전년비' else ''}".strip() for col in sum_brand.columns]
-    sum_brand = sum_brand.fillna(0)
-    sum_brand = sum_brand.astype(str)
-    sum_brand = sum_brand.applymap(lambda x: x if '%' in x else format_number(x))
-else:
-    sum_brand = sum_brand.pivot(index='브랜드', columns='기준', values='매출').fillna(0).astype(int)
-    sum_brand = sum_brand.applymap(format_number)
+with stage(prof, 'section 3', brand_index['data']) as s:
+    filtered = slice_rows(brand_index, selected_dept, selected_type, selected_site)
 
-if not sum_brand.empty:
-    total = pd.DataFrame(sum_brand.applymap(parse_sales_value).sum()).T
-    total.index = ['합계']
-    total = total.applymap(lambda x: format_number(x))
-    sum_brand = pd.concat([total, sum_brand])
-    st.dataframe(style_summary(sum_brand).set_properties(**{'text-align': 'right'}), use_container_width=True, height=500)
-else:
-    st.info("해당 조건에 맞는 브랜드 매출 데이터가 없습니다.")
+    sum_brand = filtered.groupby(['기준', '브랜드'], observed=True)['매출'].sum().reset_index()
+    if not sum_brand[sum_brand['기준'] >= VIEW_FROM].empty:
+        if view_mode == "월별":
+            cur, prev = add_total(*pivot_pair(with_yoy(sum_brand, ['브랜드']), '브랜드'), '합계')
+            sum_brand = yoy_table(cur, prev)
+        else:
+            sum_brand = sum_brand[sum_brand['기준'] >= VIEW_FROM]
+            sum_brand = sum_brand.pivot(index='브랜드', columns='기준', values='매출').fillna(0)
+            sum_brand = add_total(sum_brand, None, '합계')[0]
+        s['out'] = sum_brand
+        page = paged(sum_brand, 'page_brand', pinned=sum_brand.index == '합계')
+        st.dataframe(style_table(page), use_container_width=True, height=500)
+    else:
+        st.info("해당 조건에 맞는 브랜드 매출 데이터가 없습니다.")
 
 # 📈 추이 그래프
-st.subheader("📈 매출 추이 그래프")
-trend = data_melted.groupby(['기준', '사업부'])['매출'].sum().reset_index()
-trend = trend[trend['사업부'] != '타분류']
-for dept in sorted(trend['사업부'].unique()):
-    st.markdown(f"#### 📊 {dept} 매출 추이")
-    t = trend[trend['사업부'] == dept].copy()
-    pivot = t.pivot(index='기준', columns='사업부', values='매출').fillna(0)
-    st.line_chart(pivot)
+@st.cache_data(max_entries=8)
+def trend_tables(kind, version, freq, _view):
+    # 사업부별 / 사업부·유형별 기간 합계를 한 번씩만 pivot 하고, 실제로 그리는 사업부 단위 표마다 줄인다
+    # → {사업부: 표} 두 개 (데이터 버전·단위별 캐시). 월별은 월 큐브, 주별·일별은 일 큐브에서 만든다
+    if freq == 'M':
+        src, date_col = _view.assign(기준=pd.to_datetime(_view['기준'])), '기준'
+    else:
+        src, date_col = load_site_daily(start=VIEW_FROM), '일자'
+    by_dept = period_series(src, ['사업부'], date_col, '매출', freq)
+    by_type = period_series(src, ['사업부', '유형'], date_col, '매출', freq)
+    dept_charts = {dept: downsample_wide(by_dept[[dept]]) for dept in by_dept.columns if dept != '타분류'}
+    type_charts = {}
+    for dept in by_type.columns.get_level_values('사업부').unique():
+        if dept == '타분류': continue
+        t = by_type[dept]
+        if dept == "F&B":
+            t = t.drop(columns='직영', errors='ignore')
+        type_charts[dept] = downsample_wide(t)
+    return dept_charts, type_charts
 
-st.markdown("---")
-st.subheader("📈 사업부별 유형 매출 추이")
-for dept in sorted(data_melted['사업부'].unique()):
-    if dept == '타분류': continue
-    st.markdown(f"#### 🔹 {dept} 사업부")
-    t = data_melted[data_melted['사업부'] == dept].copy()
-    if dept == "F&B":
-        t = t[t['유형'] != '직영']
-    t = t.groupby(['기준', '유형'])['매출'].sum().reset_index()
-    if not t.empty:
-        pivot = t.pivot(index='기준', columns='유형', values='매출').fillna(0)
-        st.line_chart(pivot)
+st.subheader("📈 매출 추이 그래프")
+resolutions = list(RESOLUTIONS) if data_kind == DAILY else ['월별']
+resolution = st.radio("단위", resolutions, index=resolutions.index('월별'), horizontal=True)
+with stage(prof, 'trends', view) as s:
+    dept_charts, type_charts = trend_tables(data_kind, version, RESOLUTIONS[resolution], view)
+    s['out'] = dept_charts
+    for dept in sorted(dept_charts):
+        st.markdown(f"#### 📊 {dept} 매출 추이")
+        st.line_chart(dept_charts[dept])
+
+    st.markdown("---")
+    st.subheader("📈 사업부별 유형 매출 추이")
+    for dept in sorted(type_charts):
+        st.markdown(f"#### 🔹 {dept} 사업부")
+        if not type_charts[dept].columns.empty:
+            st.line_chart(type_charts[dept])
+
+finish(prof)
@@ -0,0 +1,110 @@
+"""MTD/YTD/SSS 보고서 일괄 생성 (Streamlit 없이)
+
+    python batch_report.py 매출.xlsx -o 보고서.xlsx                       # 전체 기준 월, 월별 시트
+    python batch_report.py 매출.xlsx -o reports/ --from 2025-01 --to 2025-06  # 월별 Parquet 파일
+    python batch_report.py 매출.xlsx -o 보고서.xlsx --divisions F&B 리테일 --workers 4
+
+app.py 와 같은 전처리(report_calc.SHEET_OPTIONS / prepare_long)와 계산(calc_bases / build_report)을 쓴다.
+기본은 현재 프로세스에서 calc_bases 한 번으로 전체 기준 월을 계산한다.
+--workers N 이면 기준 월을 연속 구간 N 개로 나눠, 구간마다 필요한 연도(첫 해의 전년 ~ 끝 해)만 잘라 보낸 뒤
+프로세스마다 calc_bases · build_report 를 돌린다 (누계 계산 자체가 나뉜다).
+"""
+import argparse
+import os
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from ingest import cached_sheet_long, read_sheet_long
+from report_calc import SHEET_OPTIONS, build_cube, build_report, calc_bases, prepare_long
+
+
+def load_cube(path, divisions=None, cache_dir=None):
+    # cache_dir 를 주면 그 폴더에 파싱 결과를 캐시한다 (앱의 ~/.streamlit/ingest_cache 와 섞지 않는다)
+    with open(path, "rb") as f:
+        data = f.read()
+    if cache_dir:
+        long_df = cached_sheet_long(data, cache_dir=cache_dir, **SHEET_OPTIONS)
+    else:
+        long_df = read_sheet_long(data, **SHEET_OPTIONS)
+    cube = build_cube(prepare_long(long_df))
+    if divisions:
+        cube = cube[cube["division"].isin(divisions)]
+    return cube
+
+
+def ref_months(cube, start=None, end=None):
+    # 데이터에 있는 기준 월 ('YYYY-MM') 중 start~end (양 끝 포함)
+    months = sorted(cube["date"].dt.strftime("%Y-%m").unique())
+    return [m for m in months if (start is None or m >= start) and (end is None or m <= end)]
+
+
+def _reports(item):
+    # (큐브, 기준 월 목록) → [(기준 월, 보고서 표)]
+    cube, months = item
+    bases = calc_bases(cube, months)
+    return [(ym, build_report(bases[ym], int(ym[:4]), formatted=False)) for ym in months]
+
+
+def month_chunks(cube, months, n):
+    # 기준 월을 연속 구간 n 개로 나누고, 구간마다 전년 대비 계산에 필요한 연도만 남긴 큐브를 붙인다
+    size = -(-len(months) // n)
+    years = cube["date"].dt.year
+    for i in range(0, len(months), size):
+        chunk = months[i:i + size]
+        yield cube[years.between(int(chunk[0][:4]) - 1, int(chunk[-1][:4]))], chunk
+
+
+def build_reports(cube, months, workers=1):
+    # {기준 월: 보고서 표}. workers=1 이면 현재 프로세스에서 한 번에, 그 밖에는 기준 월 구간별로 프로세스 풀에서
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(months) < 2:
+        return dict(_reports((cube, months)))
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        return {ym: report for part in pool.map(_reports, month_chunks(cube, months, workers)) for ym, report in part}
+
+
+def write_reports(reports, out):
+    # .xlsx → 기준 월별 시트 하나씩, 그 밖의 경로 → 폴더에 report_<YYYY-MM>.parquet
+    if out.lower().endswith(".xlsx"):
+        with pd.ExcelWriter(out, engine="openpyxl") as writer:
+            for ym, report in reports.items():
+                report.to_excel(writer, sheet_name=ym, index=False)
+        return [out]
+    os.makedirs(out, exist_ok=True)
+    paths = []
+    for ym, report in reports.items():
+        path = os.path.join(out, f"report_{ym}.parquet")
+        report.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("input", help='"DATA" 시트가 있는 매출 엑셀')
+    parser.add_argument("-o", "--out", required=True, help=".xlsx 파일 또는 Parquet 출력 폴더")
+    parser.add_argument("--from", dest="start", help="첫 기준 월 (YYYY-MM)")
+    parser.add_argument("--to", dest="end", help="마지막 기준 월 (YYYY-MM)")
+    parser.add_argument("--divisions", nargs="+", help="포함할 구분 (기본: 전체)")
+    parser.add_argument("--workers", type=int, default=1, help="프로세스 수 (기본 1, 0 이면 CPU 수)")
+    parser.add_argument("--cache-dir", help="파싱 결과 캐시 폴더 (기본: 캐시 없이 매번 파싱)")
+    args = parser.parse_args(argv)
+
+    t0 = time.perf_counter()
+    cube = load_cube(args.input, args.divisions, args.cache_dir)
+    months = ref_months(cube, args.start, args.end)
+    if not months:
+        print("해당 기간의 데이터가 없습니다.", file=sys.stderr)
+        return 1
+    reports = build_reports(cube, months, args.workers)
+    paths = write_reports(reports, args.out)
+    print(f"{len(reports)}개월 ({months[0]} ~ {months[-1]}) → {', '.join(paths[:3])}"
+          f"{' …' if len(paths) > 3 else ''}  {time.perf_counter() - t0:.1f}s")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,65 @@
+"""long 포맷 매출 프레임의 메모리 사용량 비교 (기존 object/파생 컬럼 vs compact_frame)
+
+    python bench/bench_memory.py [사이트 수] [일수]
+"""
+import os
+import sys
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+from ingest import compact_frame  # noqa: E402
+
+
+def make_long(n_sites, n_days, seed=0):
+    # app.py preprocess 결과와 같은 모양: division, site, date, sales
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range('2023-01-01', periods=n_days)
+    divisions = np.array([f"사업부{i}" for i in range(8)], dtype=object)
+    sites = np.array([f"사이트{i:04d}" for i in range(n_sites)], dtype=object)
+    return pd.DataFrame({
+        'division': np.repeat(divisions[np.arange(n_sites) % len(divisions)], n_days),
+        'site': np.repeat(sites, n_days),
+        'date': np.tile(dates.values, n_sites),
+        'sales': rng.integers(0, 5_000_000, n_sites * n_days),
+    })
+
+
+def legacy(df):
+    # 기존 preprocess: 문자열 키 + ym/year/month/day 파생 컬럼
+    df = df.copy()
+    df['division'] = df['division'].map(str)
+    df['site'] = df['site'].map(str)
+    df['ym'] = df['date'].dt.to_period('M').astype(str)
+    df['year'] = df['date'].dt.year
+    df['month'] = df['date'].dt.month
+    df['day'] = df['date'].dt.day
+    return df
+
+
+def groupby_time(df):
+    t0 = time.perf_counter()
+    for _ in range(3):
+        df.groupby(['division', 'site'], observed=True)['sales'].sum()
+    return (time.perf_counter() - t0) / 3
+
+
+def main():
+    n_sites = int(sys.argv[1]) if len(sys.argv) > 1 else 600
+    n_days = int(sys.argv[2]) if len(sys.argv) > 2 else 1095
+    base = make_long(n_sites, n_days)
+    before = legacy(base)
+    after = compact_frame(base.copy(), ['division', 'site'], 'sales')
+
+    mb_before = before.memory_usage(deep=True).sum() / 2**20
+    mb_after = after.memory_usage(deep=True).sum() / 2**20
+    print(f"rows: {len(base):,} ({n_sites} sites x {n_days} days)")
+    print(f"memory   before {mb_before:8.1f} MiB   after {mb_after:8.1f} MiB   ({mb_before / mb_after:.1f}x)")
+    gb_before, gb_after = groupby_time(before), groupby_time(after)
+    print(f"groupby  before {gb_before * 1000:8.1f} ms    after {gb_after * 1000:8.1f} ms    ({gb_before / gb_after:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""upsert_partitions 규모별 성능 (저장소 크기 × 업로드 크기) + 기존 행 단위 병합과 결과 비교
+
+    python bench/bench_merge.py
+
+기존 저장소를 임시 STORE_DIR 에 먼저 올려 두고, 업로드 한 번의 upsert_partitions 시간만 잰다.
+작은 규모에서는 app2.py 의 예전 행 단위 병합(마지막 값 우선) 결과를 long 으로 바꿔 파티션 내용과 같은지 확인한다.
+"""
+import glob
+import os
+import sys
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import sales_store  # noqa: E402
+from sales_store import DAILY, DATE_COL, ID_COLS, VALUE_COL, to_long, upsert_partitions  # noqa: E402
+
+ROWWISE_MAX_ROWS = 1000  # 행 단위 병합은 느려서 이 크기까지만 비교
+
+
+# 기존 app2.py 의 행 단위 구현 (비교 기준)
+def merge_data_rowwise(old_df, new_df):
+    merged = old_df.copy() if old_df is not None else pd.DataFrame(columns=new_df.columns)
+    for _, row in new_df.iterrows():
+        mask = (
+            (merged['사업부'] == row['사업부']) &
+            (merged['유형'] == row['유형']) &
+            (merged['사이트'] == row['사이트']) &
+            (merged['브랜드'] == row['브랜드'])
+        ) if not merged.empty else pd.Series([False] * len(merged))
+        if mask.any():
+            for col in new_df.columns[4:]:
+                if col in merged.columns:
+                    merged.loc[mask, col] = row[col]
+                else:
+                    merged[col] = row[col]
+        else:
+            merged = pd.concat([merged, pd.DataFrame([row])], ignore_index=True)
+    return merged
+
+
+def make_wide(n_rows, days, start, seed, key_offset=0):
+    rng = np.random.default_rng(seed)
+    keys = np.arange(key_offset, key_offset + n_rows)
+    df = pd.DataFrame({
+        '사업부': [f"사업부{k % 5}" for k in keys],
+        '유형': [f"유형{k % 3}" for k in keys],
+        '사이트': [f"사이트{k // 4}" for k in keys],
+        '브랜드': [f"브랜드{k}" for k in keys],
+    })
+    dates = pd.date_range(start, periods=days).strftime('%Y-%m-%d')
+    values = pd.DataFrame(rng.integers(0, 1_000_000, size=(n_rows, days)), columns=dates)
+    return pd.concat([df, values], axis=1)
+
+
+def make_case(n_rows, days, upload_share):
+    # 기존 n_rows 행 × days 일, 신규 업로드는 기존 키 중 upload_share 비율 + 신규 키 10%, 같은 날짜 범위
+    old_df = make_wide(n_rows, days, '2025-01-01', seed=1)
+    upd = make_wide(n_rows, days, '2025-01-01', seed=2).iloc[::max(1, round(1 / upload_share))]
+    add = make_wide(n_rows // 10, days, '2025-01-01', seed=3, key_offset=n_rows)
+    return old_df, pd.concat([upd, add], ignore_index=True)
+
+
+def stored_long(kind):
+    # 저장소의 파티션 전체 (키·일자 순)
+    parts = [pd.read_parquet(p) for p in sorted(glob.glob(os.path.join(sales_store.STORE_DIR, kind, '*.parquet')))]
+    return sort_long(pd.concat(parts, ignore_index=True))
+
+
+def sort_long(long_df):
+    return long_df[ID_COLS + [DATE_COL, VALUE_COL]].sort_values(ID_COLS + [DATE_COL]).reset_index(drop=True)
+
+
+def main():
+    print(f"{'rows':>7} {'days':>5} {'upload':>7} {'store':>10} {'upsert(s)':>10} {'rowwise(s)':>11}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for n_rows, days in [(200, 60), (1000, 120), (2000, 365), (5000, 365), (5000, 730)]:
+            for upload_share in (0.1, 0.5):
+                old_df, new_df = make_case(n_rows, days, upload_share)
+                new_long = to_long(new_df)
+                sales_store.STORE_DIR = tempfile.mkdtemp(dir=tmp)
+                upsert_partitions(to_long(old_df), DAILY)
+
+                t0 = time.perf_counter()
+                upsert_partitions(new_long, DAILY)
+                t_upsert = time.perf_counter() - t0
+
+                t_slow = '-'
+                if n_rows <= ROWWISE_MAX_ROWS:
+                    t0 = time.perf_counter()
+                    merged = merge_data_rowwise(old_df, new_df)
+                    t_slow = f"{time.perf_counter() - t0:.3f}"
+                    pd.testing.assert_frame_equal(stored_long(DAILY), sort_long(to_long(merged)), check_dtype=False)
+                print(f"{n_rows:>7} {days:>5} {len(new_df):>7} {n_rows * days:>10,} {t_upsert:>10.3f} {t_slow:>11}")
+
+
+if __name__ == '__main__':
+    main()
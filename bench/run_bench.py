@@ -0,0 +1,152 @@
+"""파이프라인 단계별 벤치마크 (Streamlit 없이) — 기준값 대비 회귀 시 실패
+
+    python bench/run_bench.py                 # bench/baseline.json 과 비교, 회귀 시 exit 1
+    python bench/run_bench.py --update        # 현재 결과를 기준값으로 저장
+    python bench/run_bench.py --sites 600 --days 1095 --no-compare
+
+단계마다 시간(repeat 회 중 최솟값)과 tracemalloc 최대 메모리를 잰다.
+기준값은 측정한 머신에 묶여 있으므로 다른 머신에서는 --update 로 먼저 기준값을 만든다.
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+import sales_store  # noqa: E402
+from ingest import compact_frame, read_sheet_long  # noqa: E402
+from report_calc import SHEET_OPTIONS, build_cube, build_report, calc_bases, prepare_long  # noqa: E402
+from sales_store import DAILY, ID_COLS, load_cube, upsert_partitions  # noqa: E402
+from sales_tables import add_yoy, build_site_tables  # noqa: E402
+from synth import make_app1, make_app2, to_xlsx  # noqa: E402
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+TIME_TOL = 0.5      # 기준 대비 +50% 초과 시 회귀 (타이밍 잡음 감안)
+TIME_FLOOR = 0.02   # 기준 대비 증가분이 20ms 미만이면 무시
+MEM_TOL = 0.25      # 최대 메모리 +25% 초과 시 회귀
+
+
+def measure(fn, repeat):
+    # 최소 시간 (repeat 회) + tracemalloc 최대 메모리 (별도 1회, 추적 오버헤드가 시간에 섞이지 않게)
+    times = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        out = fn()
+        times.append(time.perf_counter() - t0)
+    tracemalloc.start()
+    fn()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return out, {"seconds": round(min(times), 4), "peak_mib": round(peak / 2**20, 2)}
+
+
+def check_large_totals():
+    # int32 로 줄인 셀 값의 누계가 int32 범위(약 21억)를 넘어도 맞아야 한다
+    # 사이트 1곳 × 하루 2천만 × 2024~2025 → 2025-12 YTD = 2천만 × 365
+    dates = pd.date_range("2024-01-01", "2025-12-31")
+    df = prepare_long(pd.DataFrame({"division": "A", "site": "s", "date": dates, "sales": 20_000_000}))
+    base = calc_bases(build_cube(df), ["2025-12"])["2025-12"].iloc[0]
+    expected = {"month_cur": 20_000_000 * 31, "ytd_cur": 20_000_000 * 365, "ytd_prev": 20_000_000 * 366}
+    return [f"{col}: {base[col]} != {value}" for col, value in expected.items() if base[col] != value]
+
+
+def run_stages(scale, repeat):
+    # 단계 순서대로 실행하며 앞 단계 결과를 다음 단계 입력으로 쓴다 → {단계: 측정값}
+    results = {}
+
+    def stage(name, fn):
+        out, results[name] = measure(fn, repeat)
+        print(f"  {name:<18} {results[name]['seconds']:>8.3f} s {results[name]['peak_mib']:>9.1f} MiB")
+        return out
+
+    # app.py: DATA 시트 → long → 큐브 → 기준 월 계산 → 표
+    app1_xlsx = to_xlsx(make_app1(**scale), sheet_name="DATA")
+    long1 = stage("app1_ingest", lambda: read_sheet_long(app1_xlsx, **SHEET_OPTIONS))
+    df1 = stage("app1_preprocess", lambda: prepare_long(long1.copy()))
+    cube1 = stage("build_cube", lambda: build_cube(df1))
+    months = sorted(cube1["date"].dt.strftime("%Y-%m").unique())[-3:]
+    bases = stage("calc_bases", lambda: calc_bases(cube1, months))
+    stage("build_report", lambda: build_report(bases[months[-1]], int(months[-1][:4])))
+
+    # app2.py: 시트 → long → 파티션 저장(월 큐브 갱신) → 전년비 / 사이트 표
+    app2_xlsx = to_xlsx(make_app2(**scale))
+    long2 = stage("app2_ingest", lambda: read_sheet_long(app2_xlsx))
+
+    def fresh_upsert():
+        # 매 회 빈 저장소에 첫 업로드 (반복 측정이 기존 파티션 병합으로 바뀌지 않게)
+        sales_store.STORE_DIR = tempfile.mkdtemp(dir=store_dir)
+        return upsert_partitions(long2[ID_COLS + ["일자", "매출"]], DAILY)
+
+    with tempfile.TemporaryDirectory() as store_dir:
+        stage("upsert_partitions", fresh_upsert)
+        cube2 = compact_frame(load_cube(DAILY), ID_COLS, "매출")
+    stage("add_yoy", lambda: add_yoy(cube2, ID_COLS))
+    stage("build_site_tables", lambda: build_site_tables(cube2))
+    return results
+
+
+def compare(results, baseline):
+    # 회귀 목록: (단계, 지표, 기준, 현재)
+    failures = []
+    for name, base in baseline.items():
+        cur = results.get(name)
+        if cur is None:
+            continue
+        if cur["seconds"] > base["seconds"] * (1 + TIME_TOL) and cur["seconds"] - base["seconds"] > TIME_FLOOR:
+            failures.append((name, "seconds", base["seconds"], cur["seconds"]))
+        if cur["peak_mib"] > base["peak_mib"] * (1 + MEM_TOL):
+            failures.append((name, "peak_mib", base["peak_mib"], cur["peak_mib"]))
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--divisions", type=int, default=8)
+    parser.add_argument("--sites", type=int, default=200)
+    parser.add_argument("--brands", type=int, default=2)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--repeat", type=int, default=2)
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--update", action="store_true", help="현재 결과를 기준값으로 저장")
+    parser.add_argument("--no-compare", action="store_true", help="측정만 하고 비교하지 않음")
+    args = parser.parse_args()
+
+    errors = check_large_totals()
+    for error in errors:
+        print(f"WRONG TOTAL {error}")
+    if errors:
+        return 1
+
+    scale = dict(n_divisions=args.divisions, n_sites=args.sites, n_brands=args.brands, n_days=args.days)
+    print(f"scale: {scale}")
+    results = run_stages(scale, args.repeat)
+
+    if args.update:
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"scale": scale, "stages": results}, f, indent=2, ensure_ascii=False)
+            f.write("\n")
+        print(f"baseline saved: {args.baseline}")
+        return 0
+    if args.no_compare or not os.path.exists(args.baseline):
+        return 0
+
+    with open(args.baseline, encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline["scale"] != scale:
+        print(f"baseline scale {baseline['scale']} differs; skipping comparison")
+        return 0
+    failures = compare(results, baseline["stages"])
+    for name, metric, base, cur in failures:
+        print(f"REGRESSION {name}.{metric}: {base} -> {cur}")
+    print("FAIL" if failures else "OK")
+    return 1 if failures else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
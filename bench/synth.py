@@ -0,0 +1,84 @@
+"""두 대시보드용 합성 엑셀 생성기 (규모: 사업부·사이트·브랜드·일수)
+
+    python bench/synth.py app1 out.xlsx [--divisions 8] [--sites 300] [--brands 3] [--days 730]
+    python bench/synth.py app2 out.xlsx ...
+
+app1: app.py 가 읽는 "DATA" 시트 (구분, 사이트, 브랜드, 일자 컬럼들 …)
+app2: app2.py 가 읽는 첫 시트 (사업부, 유형, 사이트, 브랜드, 일자 컬럼들 …)
+같은 인자·seed 면 항상 같은 파일이 나온다.
+"""
+import argparse
+import io
+
+import numpy as np
+import pandas as pd
+
+TYPES = ["직영", "가맹", "위탁"]
+START = "2024-01-01"
+
+
+def make_keys(n_divisions, n_sites, n_brands):
+    # 사이트마다 브랜드 n_brands 개, 사이트는 사업부·유형에 순환 배정
+    site = np.repeat(np.arange(n_sites), n_brands)
+    return pd.DataFrame({
+        "사업부": [f"사업부{s % n_divisions}" for s in site],
+        "유형": [TYPES[(s // n_divisions) % len(TYPES)] for s in site],
+        "사이트": [f"사이트{s:05d}" for s in site],
+        "브랜드": [f"브랜드{s:05d}-{b}" for s, b in zip(site, np.tile(np.arange(n_brands), n_sites))],
+    })
+
+
+def make_values(n_rows, n_days, seed=0, start=START, closed_ratio=0.05):
+    # 일별 매출 (일부 행은 앞쪽 1년을 0 으로 두어 신규 매장 → SSS 제외 케이스를 만든다)
+    rng = np.random.default_rng(seed)
+    dates = pd.date_range(start, periods=n_days)
+    values = rng.integers(0, 3_000_000, size=(n_rows, n_days))
+    new_rows = rng.random(n_rows) < closed_ratio
+    values[new_rows, :min(365, n_days)] = 0
+    return pd.DataFrame(values, columns=dates.to_pydatetime())
+
+
+def make_app1(n_divisions=8, n_sites=300, n_brands=3, n_days=730, seed=0):
+    keys = make_keys(n_divisions, n_sites, n_brands)
+    keys = keys.rename(columns={"사업부": "구분"}).drop(columns="유형")
+    return pd.concat([keys, make_values(len(keys), n_days, seed)], axis=1)
+
+
+def make_app2(n_divisions=8, n_sites=300, n_brands=3, n_days=730, seed=0):
+    keys = make_keys(n_divisions, n_sites, n_brands)
+    return pd.concat([keys, make_values(len(keys), n_days, seed)], axis=1)
+
+
+def to_xlsx(wide, sheet_name="Sheet1"):
+    # 엑셀 바이트 (날짜 헤더는 datetime 셀로 저장되어 실제 업로드 파일과 같은 모양)
+    buf = io.BytesIO()
+    with pd.ExcelWriter(buf, engine="openpyxl") as writer:
+        wide.to_excel(writer, sheet_name=sheet_name, index=False)
+    return buf.getvalue()
+
+
+def make_workbook(layout, **scale):
+    if layout == "app1":
+        return to_xlsx(make_app1(**scale), sheet_name="DATA")
+    return to_xlsx(make_app2(**scale))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("layout", choices=["app1", "app2"])
+    parser.add_argument("out")
+    parser.add_argument("--divisions", type=int, default=8)
+    parser.add_argument("--sites", type=int, default=300)
+    parser.add_argument("--brands", type=int, default=3)
+    parser.add_argument("--days", type=int, default=730)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    data = make_workbook(args.layout, n_divisions=args.divisions, n_sites=args.sites,
+                         n_brands=args.brands, n_days=args.days, seed=args.seed)
+    with open(args.out, "wb") as f:
+        f.write(data)
+    print(f"{args.out}: {len(data) / 2**20:.1f} MiB")
+
+
+if __name__ == "__main__":
+    main()
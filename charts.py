@@ -0,0 +1,87 @@
+import numpy as np
+import pandas as pd
+
+# 차트용 시계열: 기간 단위로 한 번 집계하고, 점이 많으면 모양을 유지하며 줄인다 (LTTB)
+RESOLUTIONS = {"일별": "D", "주별": "W", "월별": "M"}
+MAX_POINTS = 400
+ALIGN_YEAR = 2000  # 연도별 누계를 같은 x 축(월-일)에 겹칠 때 쓰는 윤년
+
+
+def bucket_dates(dates, freq):
+    # 일자 → 기간 시작일. 주(월요일 시작)는 연초를 넘지 않게 1월 1일로 자른다 (연도별 누계가 섞이지 않게)
+    dates = pd.to_datetime(dates).dt.normalize()
+    if freq == "D":
+        return dates
+    if freq == "M":
+        return dates.dt.to_period("M").dt.start_time
+    week = dates - pd.to_timedelta(dates.dt.dayofweek, unit="D")
+    return week.where(week.dt.year == dates.dt.year, dates.dt.to_period("Y").dt.start_time)
+
+
+def align_year(dates):
+    # 연도를 ALIGN_YEAR 로 바꾼 날짜 (x 축 정렬용)
+    return pd.to_datetime(pd.DataFrame({"year": ALIGN_YEAR, "month": dates.dt.month, "day": dates.dt.day}))
+
+
+def cumulative_by_year(df, date_col="date", value_col="sales", freq="D"):
+    # 연도별 누계: 기간 합계 → 연도 안 누적. 점은 기간의 마지막 일자에 찍는다 → [year, date, x, value]
+    bucket = bucket_dates(df[date_col], freq).rename("bucket")
+    sums = (df.groupby([df[date_col].dt.year.rename("year"), bucket])
+              .agg(date=(date_col, "max"), value=(value_col, "sum")).reset_index())
+    sums[value_col] = sums.groupby("year")["value"].cumsum()
+    sums["x"] = align_year(sums["date"])
+    return sums[["year", "date", "x", value_col]]
+
+
+def period_series(df, keys, date_col, value_col, freq):
+    # keys 별 기간 합계 wide 표 (index=기간 시작일, columns=keys)
+    bucket = bucket_dates(df[date_col], freq).rename(date_col)
+    return (df.groupby([bucket] + [df[k] for k in keys], observed=True)[value_col].sum()
+              .unstack(keys).fillna(0).sort_index())
+
+
+# ───────────────────── 다운샘플링 (Largest-Triangle-Three-Buckets) ─────────────────────
+def lttb(x, y, n_out):
+    # 첫·끝 점을 두고, 구간마다 앞 선택점·다음 구간 평균과 이루는 삼각형이 가장 큰 점을 고른다 → 인덱스
+    n = len(x)
+    if n_out >= n or n_out < 3:
+        return np.arange(n)
+    x = np.asarray(x, dtype="float64")
+    y = np.asarray(y, dtype="float64")
+    every = (n - 2) / (n_out - 2)
+    edges = (np.arange(n_out - 1) * every).astype(int) + 1
+    edges[-1] = n - 1
+
+    idx = np.empty(n_out, dtype=int)
+    idx[0], idx[-1] = 0, n - 1
+    a = 0
+    for i in range(n_out - 2):
+        start, stop = edges[i], edges[i + 1]
+        nxt = slice(stop, edges[i + 2]) if i + 2 < len(edges) else slice(n - 1, n)
+        cx, cy = x[nxt].mean(), y[nxt].mean()
+        area = np.abs((x[a] - cx) * (y[start:stop] - y[a]) - (x[a] - x[start:stop]) * (cy - y[a]))
+        a = start + int(np.argmax(area))
+        idx[i + 1] = a
+    return idx
+
+
+def downsample(long_df, x_col, y_col, group_col, max_points=MAX_POINTS):
+    # 그룹(예: 연도) 마다 max_points 개 이하로 줄인다
+    parts = []
+    for _, part in long_df.groupby(group_col, sort=True):
+        x = part[x_col].to_numpy()
+        x = x.astype("int64") if np.issubdtype(x.dtype, np.datetime64) else x
+        parts.append(part.iloc[lttb(x, part[y_col].to_numpy(), max_points)])
+    return pd.concat(parts, ignore_index=True) if parts else long_df
+
+
+def downsample_wide(wide, max_points=MAX_POINTS):
+    # wide 표 (index=시간, 열=계열): 열마다 max_points / 열 수 개씩 고른 점의 합집합 → 공통 x 축, max_points 이하
+    if len(wide) <= max_points or wide.columns.empty:
+        return wide
+    per_column = max(3, max_points // len(wide.columns))
+    x = np.arange(len(wide))
+    keep = np.unique(np.concatenate([lttb(x, wide[c].to_numpy(), per_column) for c in wide.columns]))
+    if len(keep) > max_points:
+        keep = keep[lttb(keep, wide.iloc[keep].sum(axis=1).to_numpy(), max_points)]
+    return wide.iloc[keep]
@@ -0,0 +1,146 @@
+import hashlib
+import io
+import json
+import os
+
+import numpy as np
+import pandas as pd
+from openpyxl import load_workbook
+
+from sales_store import write_parquet
+
+# 파싱 결과 캐시: 같은 파일(내용 해시)·같은 옵션이면 엑셀을 다시 읽지 않는다
+# 최근에 쓴 CACHE_MAX_FILES 개만 남긴다 (업로드마다 long 프레임 사본이 하나씩 쌓이므로)
+CACHE_DIR = os.path.expanduser("~/.streamlit/ingest_cache")
+CACHE_MAX_FILES = 16
+PARSER_VERSION = 1  # read_sheet_long 결과가 바뀌면 올린다 (캐시 키에 들어가서 이전 캐시를 안 쓰게 됨)
+CHUNK_ROWS = 500
+
+
+def content_hash(data, options=None):
+    h = hashlib.sha256(data)
+    if options:
+        h.update(json.dumps(options, sort_keys=True, ensure_ascii=False).encode("utf-8"))
+    return h.hexdigest()
+
+
+def _open_sheet(buf, sheet_name):
+    wb = load_workbook(buf, read_only=True, data_only=True)
+    return wb, (wb[sheet_name] if sheet_name else wb.worksheets[0])
+
+
+def read_header(data, sheet_name=None):
+    # 첫 행(헤더)만 읽는다. 문자열은 앞뒤 공백 제거, 날짜 셀은 그대로
+    wb, ws = _open_sheet(io.BytesIO(data), sheet_name)
+    try:
+        header = next(ws.iter_rows(max_row=1, values_only=True), ())
+    finally:
+        wb.close()
+    return [h.strip() if isinstance(h, str) else h for h in header]
+
+
+# wide 시트(키 컬럼 + 날짜 컬럼들)를 read-only 스트리밍으로 읽어 long 프레임으로 만든다.
+# 헤더 정규화(rename: 공백 제거한 헤더 → 새 이름)와 날짜 판별은 한 번만 하고, chunk_rows 행씩
+# melt·형 변환하므로 wide 전체 프레임이나 melt 중간 사본이 생기지 않는다.
+# id_cols 를 주면 그 컬럼만 키로 남기고 나머지 비날짜 컬럼은 버린다 (없으면 비날짜 컬럼 전부).
+def read_sheet_long(data, sheet_name=None, rename=None, id_cols=None,
+                    date_col="일자", value_col="매출", chunk_rows=CHUNK_ROWS):
+    rename = rename or {}
+    wb, ws = _open_sheet(io.BytesIO(data), sheet_name)
+    try:
+        rows = ws.iter_rows(values_only=True)
+        raw = [h.strip() if isinstance(h, str) else h for h in next(rows, ())]
+        names = [rename.get(str(h).replace(" ", ""), str(h)) for h in raw]
+        dates = pd.to_datetime(pd.Index([str(h) for h in raw]), format="mixed", errors="coerce")
+
+        date_idx = [i for i, d in enumerate(dates) if pd.notna(d) and names[i] not in (id_cols or [])]
+        if id_cols is None:
+            id_idx = [i for i in range(len(names)) if i not in date_idx]
+        else:
+            id_idx = [names.index(c) for c in id_cols]
+        id_names = [names[i] for i in id_idx]
+        day_values = dates[date_idx].values
+
+        parts = []
+        chunk = []
+        for row in rows:
+            if all(v is None for v in row):
+                continue
+            chunk.append(row[:len(raw)] + (None,) * (len(raw) - len(row)))
+            if len(chunk) >= chunk_rows:
+                parts.append(_melt_chunk(chunk, id_idx, id_names, date_idx, day_values, date_col, value_col))
+                chunk = []
+        if chunk:
+            parts.append(_melt_chunk(chunk, id_idx, id_names, date_idx, day_values, date_col, value_col))
+    finally:
+        wb.close()
+
+    if not parts:
+        return _melt_chunk([], id_idx, id_names, date_idx, day_values, date_col, value_col)
+    return pd.concat(parts, ignore_index=True)
+
+
+def _melt_chunk(chunk, id_idx, id_names, date_idx, day_values, date_col, value_col):
+    block = np.empty((len(chunk), max(id_idx + date_idx, default=-1) + 1), dtype=object)
+    if chunk:
+        block[:] = [row[:block.shape[1]] for row in chunk]
+    n_days = len(date_idx)
+    out = {}
+    for name, i in zip(id_names, id_idx):
+        out[name] = pd.Series(np.repeat(block[:, i], n_days)).map(str, na_action="ignore")
+    out[date_col] = np.tile(day_values, len(chunk))
+    values = pd.Series(block[:, date_idx].ravel(), dtype=object)
+    out[value_col] = pd.to_numeric(values, errors="coerce").fillna(0)
+    return pd.DataFrame(out)
+
+
+def cached_sheet_long(data, cache_dir=CACHE_DIR, **options):
+    # 내용 해시 + 옵션 + 파서 버전으로 cache_dir 의 디스크 캐시를 조회하고, 없을 때만 엑셀을 파싱한다
+    # 캐시 파일은 임시 파일 → os.replace 로 쓰므로 반쯤 쓰인 파일은 보이지 않는다. 읽을 수 없으면 다시 파싱
+    key = content_hash(data, {**options, "parser_version": PARSER_VERSION})
+    path = os.path.join(cache_dir, f"{key}.parquet")
+    if os.path.exists(path):
+        try:
+            df = pd.read_parquet(path)
+            os.utime(path)  # 최근 사용 표시 (정리 순서)
+            return df
+        except Exception:
+            pass
+    df = read_sheet_long(data, **options)
+    write_parquet(df, path)
+    _prune_cache(cache_dir)
+    return df
+
+
+def _prune_cache(cache_dir=CACHE_DIR, max_files=CACHE_MAX_FILES):
+    # 오래 안 쓴 캐시 파일부터 지운다 (다른 세션이 먼저 지웠으면 무시)
+    entries = []
+    for name in os.listdir(cache_dir):
+        if name.endswith(".parquet"):
+            try:
+                entries.append((os.stat(os.path.join(cache_dir, name)).st_mtime_ns, name))
+            except FileNotFoundError:
+                pass
+    for _, name in sorted(entries, reverse=True)[max_files:]:
+        try:
+            os.remove(os.path.join(cache_dir, name))
+        except FileNotFoundError:
+            pass
+
+
+# ───────────────────── 메모리 절약형 dtype ─────────────────────
+INT32_MIN, INT32_MAX = np.iinfo(np.int32).min, np.iinfo(np.int32).max
+
+
+def compact_frame(df, key_cols, value_col):
+    # 행마다 반복되는 키 문자열은 category(코드 + 사전)로, 매출은 값이 허용하면 int32 로 줄인다
+    # 범위 검사는 셀 단위뿐이다: groupby 합계가 int32 로 남는 경우가 있으므로(한 행짜리 그룹 등)
+    # 합산·누계하는 쪽에서 먼저 int64 로 넓혀야 한다 (report_calc.wide_sales)
+    for col in key_cols:
+        df[col] = df[col].astype("category")
+    values = df[value_col].to_numpy()
+    if len(values) and np.issubdtype(values.dtype, np.floating) and not np.all(np.mod(values, 1) == 0):
+        return df
+    if not len(values) or (values.min() >= INT32_MIN and values.max() <= INT32_MAX):
+        df[value_col] = values.astype(np.int32)
+    return df
@@ -0,0 +1,114 @@
+import json
+import os
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+
+import pandas as pd
+import streamlit as st
+
+# 단계별 계측 (켜져 있을 때만): 실행 시간, 입력/출력 행 수, 메모리 증감(tracemalloc)
+# 결과는 단계가 끝날 때마다 PROFILE_LOG 에 JSON 한 줄씩 덧붙이고, 사이드바 패널에 보여 준다
+PROFILE_LOG = os.path.expanduser("~/.streamlit/profile.jsonl")
+PROFILE_ENV = "OTD_PROFILE"
+
+# tracemalloc 은 프로세스 전체(모든 세션)에 걸리므로 계측 중인 단계가 있을 때만 켠다.
+# 여러 세션의 단계가 겹치면 참조 수로 관리하고, 마지막 단계가 끝날 때 끈다 (직접 켠 경우만)
+_trace_lock = threading.Lock()
+_tracers = 0
+_owns_trace = False
+_stage_seq = 0
+
+
+def _acquire_trace():
+    global _tracers, _owns_trace, _stage_seq
+    with _trace_lock:
+        if _tracers == 0 and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            _owns_trace = True
+        _tracers += 1
+        _stage_seq += 1
+        return _stage_seq, _tracers > 1
+
+
+def _release_trace(seq):
+    # → 이 단계가 도는 동안 다른 세션의 단계가 겹쳤는지
+    global _tracers, _owns_trace
+    with _trace_lock:
+        overlapped = _tracers > 1 or _stage_seq != seq
+        _tracers -= 1
+        if _tracers == 0 and _owns_trace:
+            tracemalloc.stop()
+            _owns_trace = False
+        return overlapped
+
+
+def env_enabled():
+    # app.py 처럼 관리자 화면이 없는 앱은 환경 변수로 켠다 (OTD_PROFILE=1)
+    return os.environ.get(PROFILE_ENV, "") not in ("", "0")
+
+
+def start_run(app, enabled):
+    # 스크립트 실행(rerun) 한 번의 기록 묶음 (여기서는 아무것도 켜지 않는다)
+    return {"app": app, "run": datetime.now().isoformat(timespec="seconds"),
+            "enabled": bool(enabled), "records": []}
+
+
+def count_rows(obj):
+    # 프레임·Styler 는 행 수, {키: 프레임} 은 합계, 그 밖에는 None
+    if obj is None:
+        return None
+    if isinstance(obj, dict):
+        return sum(count_rows(v) or 0 for v in obj.values())
+    obj = getattr(obj, "data", obj)
+    return len(obj) if hasattr(obj, "__len__") else None
+
+
+@contextmanager
+def stage(run, name, rows_in=None, path=PROFILE_LOG):
+    # with stage(prof, "calc", df) as s: ...; s["out"] = 결과  → 행 수만 기록한다
+    # 추적 켜기/끄기와 로그 기록이 모두 finally 에 있으므로 st.stop()·rerun 으로 중간에 끝나도 남지 않는다
+    # (중첩하지 않는다: 안쪽 단계가 최대 메모리 기준점을 다시 잡는다)
+    rec = {}
+    if not run["enabled"]:
+        yield rec
+        return
+    seq, overlapped = _acquire_trace()
+    mem0 = tracemalloc.get_traced_memory()[0]
+    tracemalloc.reset_peak()
+    t0 = time.perf_counter()
+    try:
+        yield rec
+    finally:
+        seconds = time.perf_counter() - t0
+        mem, peak = tracemalloc.get_traced_memory()
+        overlapped = _release_trace(seq) or overlapped
+        record = {
+            "stage": name,
+            "seconds": round(seconds, 4),
+            "rows_in": count_rows(rows_in),
+            "rows_out": count_rows(rec.get("out")),
+            "mem_delta_mib": round((mem - mem0) / 2**20, 2),
+            "mem_peak_mib": round((peak - mem0) / 2**20, 2),
+            # 다른 세션의 계측 단계와 겹쳤으면 메모리 값에 그 세션의 할당이 섞여 있다
+            "overlapped": overlapped,
+        }
+        run["records"].append(record)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(path, "a", encoding="utf-8") as f:
+            f.write(json.dumps({"app": run["app"], "run": run["run"], **record}, ensure_ascii=False) + "\n")
+
+
+def finish(run, path=PROFILE_LOG):
+    # 사이드바 패널 (기록은 단계마다 이미 로그에 있다)
+    if not run["enabled"]:
+        return
+    with st.sidebar.expander("⏱ 단계별 프로파일링", expanded=False):
+        table = pd.DataFrame(run["records"])
+        if table.empty:
+            st.caption("기록된 단계가 없습니다.")
+            return
+        st.dataframe(table.set_index("stage"), use_container_width=True)
+        st.caption(f"합계 {table['seconds'].sum():.3f}s · 메모리는 프로세스 전체 기준 · 로그: {path}")
@@ -0,0 +1,57 @@
+import numpy as np
+import pandas as pd
+import streamlit as st
+
+TOTAL_STYLE = 'background-color: #e6f0ff'
+SUBTOTAL_STYLE = 'background-color: #ffe6ea'
+
+# 행 종류 (라벨로 판별)
+TOTAL, SUBTOTAL, SSS, DETAIL = '합계', '소계', 'SSS', 'detail'
+TABLE_PALETTE = {TOTAL: TOTAL_STYLE, SUBTOTAL: SUBTOTAL_STYLE}
+PAGE_SIZE = 50
+
+
+def row_kinds(labels):
+    # 합계('합계') / 소계('[..]', '.. 소계') / SSS('SSS' 포함, 우선) / 상세 를 한 번에 분류
+    labels = pd.Series(np.asarray(labels, dtype=str))
+    return np.select(
+        [labels.str.contains('SSS'), labels == '합계', labels.str.startswith('[') | labels.str.endswith('소계')],
+        [SSS, TOTAL, SUBTOTAL], DETAIL)
+
+
+def row_styles(df, kinds, palette):
+    # 행 종류 → 셀 CSS 프레임 (Styler.apply(axis=None) 용)
+    css = pd.Series(kinds).map(palette).fillna('').to_numpy()
+    return pd.DataFrame(np.repeat(css[:, None], df.shape[1], axis=1), index=df.index, columns=df.columns)
+
+
+def style_table(df):
+    # 행 라벨로 합계 / 소계 색을 한 번에 계산하고, 숫자 서식은 화면에서만 적용
+    styles = row_styles(df, row_kinds(df.index), TABLE_PALETTE)
+
+    yoy_cols = [c for c in df.columns if str(c).endswith('전년비')]
+    num_cols = [c for c in df.columns if c not in yoy_cols]
+    return (df.style
+            .apply(lambda _: styles, axis=None)
+            .format('{:,.0f}', subset=num_cols)
+            .format('{:+.1f}%', subset=yoy_cols, na_rep='-')
+            .set_properties(**{'text-align': 'right'}))
+
+
+# ───────────────────── 페이지 단위 렌더링 ─────────────────────
+def page_rows(df, page, page_size=PAGE_SIZE, pinned=None):
+    # pinned(불리언 마스크) 행은 매 페이지 맨 위에 두고, 나머지 행은 page(0부터) 구간만 잘라낸다
+    pinned = np.zeros(len(df), dtype=bool) if pinned is None else np.asarray(pinned, dtype=bool)
+    body = np.flatnonzero(~pinned)[page * page_size:(page + 1) * page_size]
+    return df.iloc[np.concatenate([np.flatnonzero(pinned), body])]
+
+
+def paged(df, key, pinned=None, page_size=PAGE_SIZE):
+    # 화면에 보낼 페이지만 남긴다 (서식·HTML·전송 비용이 전체 행 수와 무관해짐). 한 페이지면 위젯 없음
+    n_body = len(df) - (0 if pinned is None else int(np.sum(pinned)))
+    pages = max(1, -(-n_body // page_size))
+    page = 1
+    if pages > 1:
+        page = st.number_input(f"페이지 (1–{pages}, {n_body:,}행)", min_value=1, max_value=pages,
+                               value=1, step=1, key=key)
+    return page_rows(df, page - 1, page_size, pinned)
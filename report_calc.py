@@ -0,0 +1,141 @@
+import pandas as pd
+
+from ingest import compact_frame
+
+KEYS = ["division", "site"]
+
+# ───────────────────── 전처리 ─────────────────────
+# 한글 → 영문 컬럼 매핑 (공백 제거한 헤더 기준)
+HEADER_MAP = {"구분": "division", "사이트": "site", "일자": "date", "매출": "sales"}
+# "DATA" 시트 → long 프레임 파싱 옵션 (ingest.read_sheet_long / cached_sheet_long)
+SHEET_OPTIONS = dict(sheet_name="DATA", rename=HEADER_MAP, id_cols=KEYS, date_col="date", value_col="sales")
+
+
+def prepare_long(df):
+    # 형 변환 (연·월·일은 date 에서 필요할 때만 꺼낸다)
+    df["sales"] = df["sales"].astype(int)
+    df["division"] = df["division"].astype(str).fillna("기타")
+    return compact_frame(df, KEYS, "sales")
+
+
+# ───────────────────── 집계 큐브 ─────────────────────
+def wide_sales(df):
+    # 합산·누계용 매출: int32 로 줄인 셀 값을 int64(실수면 float64)로 넓힌다
+    # (groupby 합계의 dtype 은 데이터에 따라 int32 로 남을 수 있고, 그 dtype 으로 누계를 되돌리면 20억을 넘을 때 넘친다)
+    sales = df["sales"]
+    return sales.astype("int64" if pd.api.types.is_integer_dtype(sales) else "float64")
+
+
+# 업로드 시 한 번 만드는 division × site × 일자 매출 큐브 (원본의 중복 행·브랜드 행을 합산)
+def build_cube(df):
+    return df.assign(sales=wide_sales(df)).groupby(KEYS + ["date"], observed=True)["sales"].sum().reset_index()
+
+
+# ───────────────────── 누적·전년비·SSS 판정 ─────────────────────
+def ratio(cur, prev):
+    return "-" if prev == 0 or cur == 0 else f"{((cur/prev)-1)*100:+.1f}%"
+
+
+# 기준 월 목록('YYYY-MM')마다 사이트별 당월/YTD 누적과 SSS 여부를 한 번에 계산 → {기준 월: base}
+# 사이트별 cutoff(기준 월의 마지막 일자) 시점 누계를 연도별 누계에서 asof 조회로 꺼낸다
+def calc_bases(df, ref_months):
+    ref_months = list(dict.fromkeys(ref_months))
+
+    # 사이트 × 일자 단위로 합산 후 연도·월 누계
+    daily = df.assign(sales=wide_sales(df)).groupby(KEYS + ["date"], observed=True)["sales"].sum().reset_index()
+    daily["year"]  = daily["date"].dt.year
+    daily["month"] = daily["date"].dt.month
+    daily["day"]   = daily["date"].dt.day
+    daily["md"]    = daily["month"] * 100 + daily["day"]
+    daily.sort_values(KEYS + ["year", "md"], inplace=True)
+    daily["ytd"] = daily.groupby(KEYS + ["year"], observed=True)["sales"].cumsum()
+    daily["mtd"] = daily.groupby(KEYS + ["year", "month"], observed=True)["sales"].cumsum()
+
+    # 기준 월별 사이트 cutoff (기준 월에 행이 없는 사이트는 제외)
+    ref_keys = {int(ym[:4]) * 100 + int(ym[-2:]): ym for ym in ref_months}
+    in_ref = (daily["year"] * 100 + daily["month"]).isin(list(ref_keys))
+    cut = daily[in_ref].groupby(KEYS + ["year", "month"], observed=True)["day"].max().reset_index()
+    cut["ym"] = (cut["year"] * 100 + cut["month"]).map(ref_keys)
+    cut["md"] = cut["month"] * 100 + cut["day"]
+    dtype = daily["sales"].dtype
+    if cut.empty:
+        empty = pd.DataFrame({c: pd.Series(dtype=object) for c in KEYS})
+        for c in ["month_cur", "month_prev", "ytd_cur", "ytd_prev"]:
+            empty[c] = pd.Series(dtype=dtype)
+        empty["SSS"] = pd.Series(dtype=bool)
+        return {ym: empty.copy() for ym in ref_months}
+
+    # 당해·전년 동일 cutoff 시점 누계 조회
+    queries = pd.concat([cut.assign(side="cur"),
+                         cut.assign(side="prev", year=cut["year"] - 1)], ignore_index=True)
+    hits = pd.merge_asof(queries.sort_values("md"),
+                         daily[KEYS + ["year", "month", "md", "ytd", "mtd"]].sort_values("md"),
+                         on="md", by=KEYS + ["year"], suffixes=("", "_hit"))
+    hits["ytd"] = hits["ytd"].fillna(0).astype(dtype)
+    hits["mtd"] = hits["mtd"].where(hits["month_hit"] == hits["month"], 0).fillna(0).astype(dtype)
+
+    wide = hits.pivot_table(index=["ym"] + KEYS, columns="side", values=["mtd", "ytd"], aggfunc="sum", observed=True)
+    out = pd.DataFrame({
+        "month_cur":  wide[("mtd", "cur")],
+        "month_prev": wide[("mtd", "prev")],
+        "ytd_cur":    wide[("ytd", "cur")],
+        "ytd_prev":   wide[("ytd", "prev")],
+    }).astype(dtype).reset_index()
+    out["SSS"] = (out["month_cur"] > 0) & (out["month_prev"] > 0)  # SSS 여부
+
+    bases = {}
+    for ym in ref_months:
+        part = out[out["ym"] == ym].drop(columns="ym")
+        bases[ym] = part.sort_values(KEYS).reset_index(drop=True)
+    return bases
+
+
+# ───────────────────── 집계 + SSS 집계 ─────────────────────
+def make_total(df_part, label, cy):
+    s = df_part.select_dtypes("number").sum()
+    return pd.Series({
+        "division": label, "site": "",
+        f"{cy} 당월": s.month_cur,
+        f"{cy} YTD":  s.ytd_cur,
+        "당월 전년비(%)": ratio(s.month_cur, s.month_prev),
+        "YTD 전년비(%)":  ratio(s.ytd_cur,  s.ytd_prev)
+    })
+
+
+def build_report(base, cy, formatted=True):
+    # formatted=False 면 당월·YTD 를 숫자로 둔다 (엑셀·Parquet 내보내기용)
+    # 기본 합계 & SSS 합계
+    tot_row     = make_total(base, "합계", cy)
+    sss_tot_row = make_total(base[base["SSS"]], "SSS 합계", cy)
+
+    # division 소계 & SSS 소계
+    div_totals = []
+    div_sss_totals = []
+    for div, grp in base.groupby("division", observed=True):
+        div_totals.append(make_total(grp, f"{div} 소계", cy))
+        div_sss_totals.append(make_total(grp[grp["SSS"]], f"{div} SSS 소계", cy))
+
+    # 상세 행
+    detail = base.assign(**{
+        f"{cy} 당월":  base["month_cur"],
+        f"{cy} YTD":   base["ytd_cur"],
+        "당월 전년비(%)": base.apply(lambda r: ratio(r.month_cur, r.month_prev), axis=1),
+        "YTD 전년비(%)":  base.apply(lambda r: ratio(r.ytd_cur,  r.ytd_prev),  axis=1)
+    })[["division","site",f"{cy} 당월","당월 전년비(%)",f"{cy} YTD","YTD 전년비(%)"]]
+
+    # 병합 (합계 → SSS 합계 → 소계 → SSS 소계 → 상세)
+    table_parts = [
+        tot_row.to_frame().T,
+        sss_tot_row.to_frame().T,
+        pd.DataFrame(div_totals),
+        pd.DataFrame(div_sss_totals),
+        detail
+    ]
+    full = pd.concat(table_parts, ignore_index=True)
+    if not formatted:
+        return full.infer_objects()
+
+    # 숫자 서식 적용
+    for col in [f"{cy} 당월", f"{cy} YTD"]:
+        full[col] = full[col].apply(lambda x: f"{int(x):,}" if isinstance(x,(int,float)) else x)
+    return full
@@ -0,0 +1,253 @@
+import os
+import re
+import tempfile
+import threading
+from contextlib import contextmanager
+
+import pandas as pd
+
+try:
+    import fcntl
+except ImportError:  # Windows: 프로세스 간 잠금 없이 스레드 잠금만 사용
+    fcntl = None
+
+# 파일 경로 (기존 wide CSV 는 마이그레이션 원본으로만 사용)
+DAILY_FILE = os.path.expanduser("~/.streamlit/saved_daily.csv")
+MONTHLY_FILE = os.path.expanduser("~/.streamlit/saved_monthly.csv")
+
+# long 포맷 Parquet 저장소: STORE_DIR/<종류>/<YYYY-MM>.parquet
+STORE_DIR = os.path.expanduser("~/.streamlit/sales_store")
+DAILY = 'daily'
+MONTHLY = 'monthly'
+
+# 행을 식별하는 키 컬럼 (사업부, 유형, 사이트, 브랜드)
+ID_COLS = ['사업부', '유형', '사이트', '브랜드']
+DATE_COL = '일자'
+VALUE_COL = '매출'
+PERIOD_COL = '기준'
+SITE_COLS = ['사업부', '유형', '사이트']
+SITE_REF_COLS = ['사이트', '사업부', '유형', '브랜드']
+
+
+def is_month_based(columns):
+    date_cols = [col for col in columns if re.match(r'^\d{4}-\d{2}$', str(col))]
+    if not date_cols:
+        return False
+    try:
+        sample = pd.to_datetime(date_cols, format='%Y-%m', errors='coerce')
+        return sample.notna().all()
+    except:
+        return False
+
+
+def load_data(file_path):
+    if os.path.exists(file_path):
+        return pd.read_csv(file_path)
+    return None
+
+
+# ───────────────────── 원자적 쓰기 + 잠금 ─────────────────────
+# 쓰기는 같은 폴더의 임시 파일에 쓴 뒤 os.replace 로 바꿔치기한다 → 읽는 쪽은 항상 완성된 파일만 본다.
+# 읽기-수정-쓰기(업로드, 큐브 생성)는 store_lock 안에서 한다: 프로세스 안은 RLock, 프로세스 간은 flock.
+_THREAD_LOCK = threading.RLock()
+_lock_depth = 0
+_lock_file = None
+
+
+@contextmanager
+def store_lock():
+    # 같은 스레드에서 중첩해도 된다 (flock 은 가장 바깥에서 한 번만 잡는다)
+    global _lock_depth, _lock_file
+    with _THREAD_LOCK:
+        if _lock_depth == 0 and fcntl is not None:
+            os.makedirs(STORE_DIR, exist_ok=True)
+            _lock_file = open(os.path.join(STORE_DIR, '.lock'), 'w')
+            fcntl.flock(_lock_file, fcntl.LOCK_EX)
+        _lock_depth += 1
+        try:
+            yield
+        finally:
+            _lock_depth -= 1
+            if _lock_depth == 0 and _lock_file is not None:
+                fcntl.flock(_lock_file, fcntl.LOCK_UN)
+                _lock_file.close()
+                _lock_file = None
+
+
+def write_parquet(df, path):
+    folder = os.path.dirname(path)
+    os.makedirs(folder, exist_ok=True)
+    fd, tmp = tempfile.mkstemp(dir=folder, prefix='.', suffix='.tmp')
+    os.close(fd)
+    try:
+        df.to_parquet(tmp, index=False)
+        os.replace(tmp, path)
+    except BaseException:
+        os.remove(tmp)
+        raise
+
+
+# ───────────────────── long 포맷 파티션 저장소 ─────────────────────
+def to_long(wide_df):
+    # 날짜 헤더는 컬럼 수만큼만 한 번 파싱하고, 날짜가 아닌 컬럼은 버린다
+    value_cols = [c for c in wide_df.columns if c not in ID_COLS]
+    dates = pd.to_datetime(pd.Index(value_cols).map(str), format='mixed', errors='coerce')
+    date_map = {c: d for c, d in zip(value_cols, dates) if pd.notna(d)}
+
+    long_df = wide_df[ID_COLS + list(date_map)].rename(columns=date_map).melt(
+        id_vars=ID_COLS, var_name=DATE_COL, value_name=VALUE_COL)
+    long_df[DATE_COL] = pd.to_datetime(long_df[DATE_COL])
+    long_df[VALUE_COL] = pd.to_numeric(long_df[VALUE_COL], errors='coerce').fillna(0)
+    for col in ID_COLS:
+        long_df[col] = long_df[col].map(str, na_action='ignore')
+    return long_df
+
+
+def _partition_path(kind, ym):
+    return os.path.join(STORE_DIR, kind, f"{ym}.parquet")
+
+
+def list_months(kind):
+    part_dir = os.path.join(STORE_DIR, kind)
+    if not os.path.isdir(part_dir):
+        return []
+    return sorted(f[:-len('.parquet')] for f in os.listdir(part_dir) if f.endswith('.parquet'))
+
+
+def upsert_partitions(long_df, kind):
+    # 업로드에 포함된 월 파티션만 다시 쓴다 (같은 키·일자는 마지막 값 우선)
+    months = long_df[DATE_COL].dt.strftime('%Y-%m')
+    with store_lock():
+        for ym, part in long_df.groupby(months):
+            path = _partition_path(kind, ym)
+            if os.path.exists(path):
+                part = pd.concat([pd.read_parquet(path), part], ignore_index=True)
+            part = part.drop_duplicates(subset=ID_COLS + [DATE_COL], keep='last')
+            write_parquet(part, path)
+        changed = sorted(months.unique())
+        refresh_cube(kind, changed)
+        if kind == DAILY:
+            update_site_ref(long_df)
+    return changed
+
+
+# ───────────────────── 집계 큐브 ─────────────────────
+# 월 큐브:   STORE_DIR/cube/<종류>_monthly.parquet     (기준 × 사업부 × 유형 × 사이트 × 브랜드)
+# 일 큐브:   STORE_DIR/cube/daily_site/<YYYY-MM>.parquet (일자 × 사업부 × 유형 × 사이트, 일별 저장소만)
+# 사이트표:  STORE_DIR/cube/site_ref.parquet          (일별 저장소의 사이트 → 사업부·유형·브랜드)
+def _cube_path(kind):
+    return os.path.join(STORE_DIR, 'cube', f"{kind}_monthly.parquet")
+
+
+def _site_daily_path(ym):
+    return os.path.join(STORE_DIR, 'cube', 'daily_site', f"{ym}.parquet")
+
+
+def refresh_cube(kind, months):
+    # 바뀐 월 파티션만 다시 집계해서 큐브의 해당 월을 교체한다 (store_lock 안에서 호출)
+    rows = []
+    for ym in months:
+        part = pd.read_parquet(_partition_path(kind, ym))
+        monthly = part.groupby(ID_COLS, dropna=False)[VALUE_COL].sum().reset_index()
+        monthly.insert(0, PERIOD_COL, ym)
+        rows.append(monthly)
+        if kind == DAILY:
+            site_daily = part.groupby(SITE_COLS + [DATE_COL], dropna=False)[VALUE_COL].sum().reset_index()
+            write_parquet(site_daily, _site_daily_path(ym))
+
+    path = _cube_path(kind)
+    if os.path.exists(path):
+        cube = pd.read_parquet(path)
+        rows.insert(0, cube[~cube[PERIOD_COL].isin(months)])
+    if not rows:
+        return
+    cube = pd.concat(rows, ignore_index=True).sort_values([PERIOD_COL] + ID_COLS, ignore_index=True)
+    write_parquet(cube, path)
+
+
+def load_cube(kind, start=None, end=None):
+    # 월 큐브를 읽는다. 큐브가 아직 없으면 (큐브 도입 전 저장소) 전체 파티션으로 한 번 만든다
+    path = _cube_path(kind)
+    if not os.path.exists(path):
+        with store_lock():
+            if not os.path.exists(path):
+                refresh_cube(kind, list_months(kind))
+    if not os.path.exists(path):
+        empty = pd.DataFrame({c: pd.Series(dtype=object) for c in [PERIOD_COL] + ID_COLS})
+        empty[VALUE_COL] = pd.Series(dtype=float)
+        return empty
+    cube = pd.read_parquet(path)
+    if start is not None:
+        cube = cube[cube[PERIOD_COL] >= start]
+    if end is not None:
+        cube = cube[cube[PERIOD_COL] <= end]
+    return cube.reset_index(drop=True)
+
+
+def _site_ref_path():
+    return os.path.join(STORE_DIR, 'cube', 'site_ref.parquet')
+
+
+def update_site_ref(long_df):
+    # 일별 업로드의 키 조합만 기존 사이트표에 합친다 (일별 이력 전체를 다시 읽지 않음)
+    path = _site_ref_path()
+    ref = long_df[SITE_REF_COLS].drop_duplicates()
+    with store_lock():
+        if os.path.exists(path):
+            ref = pd.concat([pd.read_parquet(path), ref], ignore_index=True).drop_duplicates()
+        write_parquet(ref, path)
+
+
+def load_site_ref():
+    # 월별 업로드에 사업부·유형·브랜드를 붙일 때 쓰는 사이트표. 없으면 일별 월 큐브로 한 번 만든다
+    path = _site_ref_path()
+    if not os.path.exists(path):
+        cube = load_cube(DAILY)
+        if cube.empty:
+            return cube[SITE_REF_COLS]
+        with store_lock():
+            if not os.path.exists(path):
+                update_site_ref(cube)
+    return pd.read_parquet(path)
+
+
+def cube_version(kind):
+    # 큐브가 다시 쓰일 때마다 바뀌는 값 (캐시 키로 사용)
+    path = _cube_path(kind)
+    return os.stat(path).st_mtime_ns if os.path.exists(path) else 0
+
+
+def load_site_daily(start=None, end=None):
+    # 일 큐브(사이트 단위 일 매출)를 필요한 월만 읽는다
+    months = [m for m in list_months(DAILY)
+              if (start is None or m >= start) and (end is None or m <= end)]
+    if any(not os.path.exists(_site_daily_path(m)) for m in months):
+        with store_lock():
+            missing = [m for m in months if not os.path.exists(_site_daily_path(m))]
+            if missing:
+                refresh_cube(DAILY, missing)
+    if not months:
+        empty = pd.DataFrame({c: pd.Series(dtype=object) for c in SITE_COLS})
+        empty[DATE_COL] = pd.Series(dtype='datetime64[ns]')
+        empty[VALUE_COL] = pd.Series(dtype=float)
+        return empty
+    return pd.concat([pd.read_parquet(_site_daily_path(m)) for m in months], ignore_index=True)
+
+
+def migrate_legacy_csv():
+    # 기존 saved_daily.csv / saved_monthly.csv 를 한 번만 파티션 저장소로 옮긴다
+    # (여러 세션이 동시에 시작해도 잠금 안에서 다시 확인하므로 한 번만 옮긴다)
+    migrated = []
+    for csv_path, kind in [(DAILY_FILE, DAILY), (MONTHLY_FILE, MONTHLY)]:
+        if list_months(kind) or not os.path.exists(csv_path):
+            continue
+        with store_lock():
+            if list_months(kind):
+                continue
+            upsert_partitions(to_long(load_data(csv_path)), kind)
+        migrated.append(kind)
+    return migrated
+
+
+if __name__ == '__main__':
+    print("migrated:", migrate_legacy_csv() or "nothing")
@@ -0,0 +1,87 @@
+import pandas as pd
+
+PERIOD_COL = '기준'
+VALUE_COL = '매출'
+PREV_COL = '매출_전년'
+YOY_COL = '전년비'
+
+
+def shift_period(ym, months):
+    # 'YYYY-MM' 을 months 개월 이동
+    return str(pd.Period(ym, freq='M') + months)
+
+
+def add_yoy(df, group_cols, years=1, value_col=VALUE_COL, period_col=PERIOD_COL):
+    # 같은 그룹의 years 년 전 기간 값을 (그룹 키 + 기간) 으로 정렬 조인해 증감률(%)을 붙인다
+    # df 는 (group_cols, period_col) 당 한 행인 집계 결과여야 하고, 전년 값이 없거나 0 이면 NaN
+    keys = list(group_cols) + [period_col]
+    prev = df[keys + [value_col]].rename(columns={value_col: PREV_COL})
+
+    periods = prev[period_col].unique()
+    shifted = (pd.PeriodIndex(periods, freq='M') + 12 * years).strftime('%Y-%m')
+    prev[period_col] = prev[period_col].map(dict(zip(periods, shifted)))
+
+    out = df.merge(prev, on=keys, how='left')
+    base = out[PREV_COL].where(out[PREV_COL] != 0)
+    out[YOY_COL] = ((out[value_col] - base) / base * 100).round(1)
+    return out
+
+
+# ───────────────────── 숫자 표 (서식은 render 에서만) ─────────────────────
+def pivot_pair(df, index):
+    # add_yoy 결과를 기간별 매출 / 전년 매출 wide 표 두 개로
+    wide = df.pivot(index=index, columns=PERIOD_COL, values=[VALUE_COL, PREV_COL])
+    return wide[VALUE_COL].fillna(0), wide[PREV_COL].fillna(0)
+
+
+def add_total(cur, prev, label, rows=None):
+    # rows(불리언 마스크, 없으면 전체) 합계 행을 label 로 맨 위에 붙인다
+    def total(frame):
+        part = frame if rows is None else frame[rows]
+        return pd.concat([part.sum().to_frame(label).T, frame])
+    return total(cur), (None if prev is None else total(prev))
+
+
+def yoy_table(cur, prev):
+    # 기간마다 [매출, '기간 전년비'] 순서로 교차 배치 (전년 0 이면 NaN)
+    base = prev.reindex_like(cur).where(lambda x: x != 0)
+    yoy = ((cur - base) / base * 100).round(1)
+    columns = [c for p in cur.columns for c in (p, f"{p} {YOY_COL}")]
+    return pd.concat([cur, yoy.add_suffix(f" {YOY_COL}")], axis=1)[columns].rename_axis(columns=None)
+
+
+# ───────────────────── 2️⃣ 사이트별 표 일괄 생성 ─────────────────────
+SITE_KEYS = ['사업부', '유형', '사이트']
+
+
+def build_site_tables(df, view_from=None):
+    # (사업부, 유형, 사이트, 기준) groupby 한 번으로 전 사업부의 사이트 표를 만든다 → {사업부: 표}
+    # 표 순서: 합계 → [유형 소계] → 사이트 ... (유형별 반복)
+    sums = df.groupby(SITE_KEYS + [PERIOD_COL], observed=True)[VALUE_COL].sum().reset_index()
+    sums = add_yoy(sums, SITE_KEYS)
+    if view_from is not None:
+        sums = sums[sums[PERIOD_COL] >= view_from]
+    if sums.empty:
+        return {}
+    wide = sums.set_index(SITE_KEYS + [PERIOD_COL])[[VALUE_COL, PREV_COL]].unstack(PERIOD_COL).fillna(0)
+
+    # 계층 롤업: 사업부 합계(0) / 유형 소계(1) / 사이트 상세(2) 를 한 프레임에 쌓고 한 번에 정렬
+    subtotal = wide.groupby(level=['사업부', '유형'], observed=True).sum()
+    total = wide.groupby(level='사업부', observed=True).sum()
+
+    def keyed(frame, depts, types, level, labels):
+        frame.index = pd.MultiIndex.from_arrays(
+            [depts, types, [level] * len(frame), labels], names=['사업부', '유형', '_level', '사이트'])
+        return frame
+
+    sub_types = subtotal.index.get_level_values('유형').astype(str)
+    rolled = pd.concat([
+        keyed(total, total.index, [''] * len(total), 0, ['합계'] * len(total)),
+        keyed(subtotal, subtotal.index.get_level_values('사업부'), sub_types, 1, '[' + sub_types + ' 소계]'),
+        keyed(wide.copy(), wide.index.get_level_values('사업부'), wide.index.get_level_values('유형'), 2,
+              wide.index.get_level_values('사이트')),
+    ]).sort_index()
+
+    table = yoy_table(rolled[VALUE_COL], rolled[PREV_COL])
+    return {dept: part.droplevel(['사업부', '유형', '_level'])
+            for dept, part in table.groupby(level='사업부', sort=True, observed=True)}
@@ -0,0 +1,41 @@
+import numpy as np
+
+
+# 키 순서대로 정렬해 두고, 모든 접두 키 조합(예: (사업부,), (사업부, 유형), (사업부, 유형, 사이트))의
+# 연속 행 범위와 다음 단계 선택지를 미리 계산한다. 데이터가 바뀔 때만 다시 만든다.
+# option_rows(df 와 같은 인덱스의 불리언 Series)를 주면 그 행이 하나라도 있는 키만 선택지로 둔다
+# (예: 전년비용으로 함께 읽은 이전 기간에만 있는 사이트는 목록에서 뺀다. 행 범위는 전체 기준)
+def build_slice_index(df, keys, option_rows=None):
+    data = df.sort_values(keys, kind="stable")
+    listed = None if option_rows is None else option_rows.reindex(data.index).to_numpy(dtype=bool)
+    data = data.reset_index(drop=True)
+    bounds = {(): (0, len(data))}
+    children = {}
+    for depth in range(1, len(keys) + 1):
+        for key, pos in data.groupby(keys[:depth], sort=True, observed=True).indices.items():
+            key = key if isinstance(key, tuple) else (key,)
+            bounds[key] = (pos[0], pos[-1] + 1)
+            if listed is None or listed[pos].any():
+                children.setdefault(key[:-1], []).append(key[-1])
+    return {"data": data, "keys": list(keys), "bounds": bounds, "children": children}
+
+
+def slice_options(index, *prefix):
+    # prefix 다음 단계의 선택지 (정렬됨)
+    return index["children"].get(tuple(prefix), [])
+
+
+def slice_rows(index, *prefix):
+    # prefix 에 해당하는 행 (정렬된 데이터의 연속 구간이므로 스캔 없이 잘라낸다)
+    start, stop = index["bounds"].get(tuple(prefix), (0, 0))
+    return index["data"].iloc[start:stop]
+
+
+def slice_rows_many(index, prefixes):
+    # 여러 prefix 의 행을 합친다 (예: 선택한 division 여러 개)
+    prefixes = [p if isinstance(p, tuple) else (p,) for p in prefixes]
+    ranges = [index["bounds"][p] for p in prefixes if p in index["bounds"]]
+    if not ranges:
+        return index["data"].iloc[0:0]
+    positions = np.concatenate([np.arange(start, stop) for start, stop in sorted(ranges)])
+    return index["data"].iloc[positions]